@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from .carts import refresh_cart_totals
 from .models import Cart, CartItem, Category, CustomUser, Product
 
 # Register your models here.
@@ -31,8 +32,28 @@ class CartItemInline(admin.TabularInline):
     extra = 0
 
 class CartAdmin(admin.ModelAdmin):
-    list_display = ("cart_code", "created_at", "updated_at")
+    list_display = ("cart_code", "item_count", "total_quantity", "total_amount", "created_at", "updated_at")
+    readonly_fields = ("item_count", "total_quantity", "total_amount")
     inlines = [CartItemInline]
 
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        refresh_cart_totals(Cart.objects.filter(pk=form.instance.pk))
+
 admin.site.register(Cart, CartAdmin)
-admin.site.register(CartItem)
\ No newline at end of file
+
+class CartItemAdmin(admin.ModelAdmin):
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        refresh_cart_totals(Cart.objects.filter(pk=obj.cart_id))
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        refresh_cart_totals(Cart.objects.filter(pk=obj.cart_id))
+
+    def delete_queryset(self, request, queryset):
+        cart_ids = list(queryset.values_list('cart_id', flat=True))
+        super().delete_queryset(request, queryset)
+        refresh_cart_totals(Cart.objects.filter(pk__in=cart_ids))
+
+admin.site.register(CartItem, CartItemAdmin)
\ No newline at end of file
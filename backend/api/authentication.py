@@ -1,17 +1,81 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import ValidationError
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache import cache_is_shared
+from .user_cache import USER_CACHE_FIELDS, cached_user_entry, store_user_entry
 
 User = get_user_model()
 
 class EmailBackend(ModelBackend):
+    """
+    The only configured backend: one user lookup and exactly one password
+    hash per attempt. Unknown emails run a dummy hash so they cost (and take)
+    the same as a wrong password. Permissions come from ModelBackend.
+    """
+
     def authenticate(self, request, username=None, password=None, **kwargs):
         if username is None:
             username = kwargs.get('email')
+        if username is None or password is None:
+            return None
         try:
             user = User.objects.get(email=username)
         except User.DoesNotExist:
+            User().set_password(password)
             return None
-        
+
         if user.check_password(password) and self.user_can_authenticate(user):
             return user
         return None
+
+
+# Access-token claims ClaimsJWTAuthentication builds request.user from
+USER_CLAIMS = ('email', 'role')
+
+
+def user_from_fields(fields):
+    """A CustomUser holding `fields`; every other field is deferred."""
+    names = [f.attname for f in User._meta.concrete_fields if f.attname in fields]
+    return User.from_db(DEFAULT_DB_ALIAS, names, [fields[name] for name in names])
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication without the per-request user lookup.
+
+    request.user is built from the cached profile fields (api/user_cache.py)
+    or, when the user is not cached, from the signed `email` / `role` claims
+    with the rest of the row deferred. Views that only need the id (carts,
+    wishlists) never touch the users table; reading any other field loads it
+    in one query. Tokens issued without those claims, and every request when
+    the cache is not shared, fall back to the DB.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = User._meta.pk.to_python(validated_token[api_settings.USER_ID_CLAIM])
+        except (KeyError, ValidationError) as e:
+            raise InvalidToken(_('Token contained no recognizable user identification')) from e
+
+        fields = cached_user_entry(user_id)
+        if fields is None and cache_is_shared() and all(claim in validated_token for claim in USER_CLAIMS):
+            # Deactivations are cached for longer than an access token lives
+            # (user_cache._timeout), so a miss means none since this token was issued
+            fields = {claim: validated_token[claim] for claim in USER_CLAIMS}
+            fields.update(id=user_id, is_active=True)
+        elif fields is None:
+            fields = User.objects.filter(pk=user_id).values(*USER_CACHE_FIELDS).first()
+            if fields is None:
+                raise AuthenticationFailed(_('User not found'), code='user_not_found')
+            store_user_entry(fields)
+
+        if not fields.get('is_active', False):
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return user_from_fields(fields)
@@ -0,0 +1,118 @@
+"""
+Server-side response cache for the public catalog endpoints.
+
+Every cached body is keyed by the current catalog version, which is bumped by
+the Product/Category save/delete signals. Invalidation is therefore a single
+counter increment; stale entries are never read again and expire on their own.
+"""
+import gzip
+import hashlib
+import time
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+CATALOG_VERSION_KEY = 'catalog:version'
+MIN_GZIP_SIZE = 512
+
+
+def cache_is_shared():
+    """
+    False for the per-process LocMemCache and for DummyCache: other workers and
+    management commands never see what this process writes to them.
+    """
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def get_catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # Seed from the clock so a version evicted from the cache can never
+        # come back lower than one that keyed entries still alive.
+        cache.add(CATALOG_VERSION_KEY, int(time.time() * 1000), timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        get_catalog_version()
+
+
+def normalized_query(request):
+    return urlencode(sorted(
+        (key, value) for key, values in request.GET.lists() for value in values
+    ))
+
+
+def catalog_cache_key(request):
+    query = normalized_query(request)
+    digest = hashlib.md5(f'{request.get_host()}{request.path}?{query}'.encode('utf-8')).hexdigest()
+    return f'catalog:{get_catalog_version()}:{digest}'
+
+
+def catalog_data_key(prefix, params):
+    """Versioned key for derived catalog data (e.g. facets) keyed by the given params."""
+    signature = urlencode(sorted(params))
+    digest = hashlib.md5(signature.encode('utf-8')).hexdigest()
+    return f'catalog:{get_catalog_version()}:{prefix}:{digest}'
+
+
+def _accepts_gzip(request):
+    return 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+
+
+def _build_response(entry, request):
+    status_code, content_type, body, gzipped = entry
+    if gzipped is not None and _accepts_gzip(request):
+        response = HttpResponse(gzipped, status=status_code, content_type=content_type)
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(body, status=status_code, content_type=content_type)
+    patch_vary_headers(response, ('Accept', 'Accept-Encoding'))
+    return response
+
+
+def cache_catalog_response(view_func):
+    """
+    Cache successful JSON GET responses of a catalog view.
+
+    Browsable-API (text/html) requests bypass the cache. Bodies above
+    MIN_GZIP_SIZE are also stored gzip-compressed when CATALOG_CACHE_GZIP is
+    enabled and served as-is to clients that accept gzip.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if request.method != 'GET' or 'text/html' in request.META.get('HTTP_ACCEPT', ''):
+            return view_func(request, *args, **kwargs)
+
+        key = catalog_cache_key(request)
+        entry = cache.get(key)
+        if entry is not None:
+            response = _build_response(entry, request)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        response = view_func(request, *args, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        content_type = response.get('Content-Type', '')
+        if response.status_code == 200 and content_type.startswith('application/json'):
+            body = response.content
+            gzipped = None
+            if settings.CATALOG_CACHE_GZIP and len(body) >= MIN_GZIP_SIZE:
+                gzipped = gzip.compress(body, compresslevel=6)
+            cache.set(key, (200, content_type, body, gzipped), settings.CATALOG_CACHE_TIMEOUT)
+        patch_vary_headers(response, ('Accept', 'Accept-Encoding'))
+        response['X-Cache'] = 'MISS'
+        return response
+
+    return wrapper
@@ -0,0 +1,473 @@
+"""
+Where carts live between requests.
+
+With CART_STORE = 'db' (the default) every cart operation goes straight to
+Cart / CartItem through api.carts. With CART_STORE = 'cache', carts used by
+anonymous visitors are kept in Django's cache instead and written back to the
+database in batches (write-behind):
+
+* periodically, by `manage.py flush_carts` (cron, or `--interval` to loop);
+* when a logged-in user touches the cart (any cart request, login or signup
+  with a cart_code);
+* explicitly with `flush_cart(cart_code)`, e.g. before checkout.
+
+While a cart is in the cache, that entry is authoritative over its database
+row. New carts and new items get no row until the flush: they carry
+provisional (negative) ids, unique and stable until the flush writes the rows
+and replaces them with the real ids.
+
+Every change to a cached cart takes a short per-cart lock. A clean cart that
+turns dirty is appended to a log in the cache. Its keys are numbered by an
+atomic counter, so any backend with an atomic incr() (locmem, Redis,
+Memcached) can be used without losing dirty carts.
+"""
+import time
+import uuid
+from contextlib import contextmanager
+from functools import wraps
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .carts import (
+    add_cart_item,
+    apply_cart_operations,
+    cart_items_prefetch,
+    fold_operations,
+    load_cart_items,
+    remove_cart_item,
+    set_cart_item_quantity,
+    set_cart_items,
+    touch_cart,
+)
+from .models import Cart, CartItem, Product
+
+DIRTY_SEQ_KEY = 'cart:dirty:seq'
+PROVISIONAL_SEQ_KEY = 'cart:provisional:seq'
+FLUSHED_KEY = 'cart:dirty:flushed'
+FLUSH_LOCK_KEY = 'cart:flush:lock'
+LOCK_TIMEOUT = 5
+LOCK_WAIT = 1.0
+SUMMARY_FIELDS = ('id', 'cart_code', 'item_count', 'total_quantity', 'total_amount')
+
+
+def cache_store_enabled():
+    return settings.CART_STORE == 'cache'
+
+
+def _entry_key(cart_code):
+    return f'cart:{cart_code}'
+
+
+def _dirty_key(seq):
+    return f'cart:dirty:{seq}'
+
+
+class CartLocked(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'The cart is being updated by another request, please retry.'
+    default_code = 'cart_locked'
+
+
+@contextmanager
+def _cart_lock(cart_code):
+    """
+    Serialize read-modify-write cycles on one cached cart. Retries for up to
+    LOCK_WAIT seconds, then raises CartLocked (409) rather than writing
+    unlocked. The lock expires after LOCK_TIMEOUT in case its holder died.
+    """
+    key = f'cart:lock:{cart_code}'
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + LOCK_WAIT
+    while not cache.add(key, token, timeout=LOCK_TIMEOUT):
+        if time.monotonic() >= deadline:
+            raise CartLocked()
+        time.sleep(0.005)
+    try:
+        yield
+    finally:
+        # Only release our own lock: after LOCK_TIMEOUT it may belong to someone else
+        if cache.get(key) == token:
+            cache.delete(key)
+
+
+def cached_cart_entry(cart_code):
+    """The cache entry for a cart, or None when it is not held in the cache."""
+    if not cache_store_enabled():
+        return None
+    return cache.get(_entry_key(cart_code))
+
+
+def _provisional_cart_id():
+    # Seeded from the clock like the membership version, so a counter evicted
+    # and restarted does not hand out an id again
+    cache.add(PROVISIONAL_SEQ_KEY, int(time.time() * 1000), timeout=None)
+    try:
+        return -cache.incr(PROVISIONAL_SEQ_KEY)
+    except ValueError:
+        cache.add(PROVISIONAL_SEQ_KEY, int(time.time() * 1000), timeout=None)
+        return -cache.incr(PROVISIONAL_SEQ_KEY)
+
+
+def _log_dirty(cart_code):
+    cache.add(DIRTY_SEQ_KEY, 0, timeout=None)
+    try:
+        seq = cache.incr(DIRTY_SEQ_KEY)
+    except ValueError:
+        # Evicted between add() and incr(); the flusher copes with a reset counter
+        cache.add(DIRTY_SEQ_KEY, 0, timeout=None)
+        seq = cache.incr(DIRTY_SEQ_KEY)
+    cache.set(_dirty_key(seq), cart_code, settings.CART_CACHE_TIMEOUT)
+
+
+def _store_entry(cart_code, entry):
+    """Save a modified entry, logging it for the next write-behind flush."""
+    was_dirty = entry['dirty']
+    entry.update(dirty=True, rev=entry['rev'] + 1, updated_at=time.time())
+    cache.set(_entry_key(cart_code), entry, settings.CART_CACHE_TIMEOUT)
+    if not was_dirty:
+        _log_dirty(cart_code)
+
+
+def _entry_from_db(cart):
+    items = CartItem.objects.filter(cart=cart).order_by('id').values_list('product_id', 'quantity', 'id')
+    return {
+        'id': cart.pk,
+        'items': {product_id: quantity for product_id, quantity, _ in items},
+        'item_ids': {product_id: item_id for product_id, _, item_id in items},
+        'updated_at': cart.updated_at.timestamp(),
+        'dirty': False,
+        'rev': 0,
+    }
+
+
+def _assign_item_ids(entry):
+    """Give items new to the entry a provisional id; the flush writes their rows."""
+    item_ids = entry.get('item_ids', {})
+    next_id = entry.get('next_item_id', -1)
+    ids = {}
+    for product_id in entry['items']:
+        if product_id not in item_ids:
+            item_ids[product_id], next_id = next_id, next_id - 1
+        ids[product_id] = item_ids[product_id]
+    entry.update(item_ids=ids, next_item_id=next_id)
+
+
+def _write_entries(entries):
+    """
+    Persist {cart_code: entry} in one transaction, creating the rows of new
+    carts (and of carts whose row was reaped) in one INSERT. Items whose
+    product has been deleted meanwhile are dropped. The entries get the real
+    cart and item ids.
+    """
+    product_ids = {product_id for entry in entries.values() for product_id in entry['items']}
+    existing_products = set(Product.objects.filter(id__in=product_ids).values_list('id', flat=True))
+    carts = {cart.cart_code: cart for cart in Cart.objects.filter(cart_code__in=entries)}
+    missing = entries.keys() - carts.keys()
+    if missing:
+        Cart.objects.bulk_create([Cart(cart_code=cart_code) for cart_code in missing], ignore_conflicts=True)
+        # Re-read: not every backend (MySQL) returns the new primary keys
+        carts.update((cart.cart_code, cart) for cart in Cart.objects.filter(cart_code__in=missing))
+
+    for cart_code, entry in entries.items():
+        cart = carts[cart_code]
+        items = {pid: quantity for pid, quantity in entry['items'].items() if pid in existing_products}
+        CartItem.objects.filter(cart=cart).exclude(product_id__in=items).delete()
+        if items:
+            set_cart_items(cart, items)
+        touch_cart(cart)
+        entry['id'] = cart.pk
+        entry['item_ids'] = {}
+
+    by_cart_id = {entry['id']: entry for entry in entries.values()}
+    rows = CartItem.objects.filter(cart_id__in=by_cart_id).values_list('cart_id', 'product_id', 'id')
+    for cart_id, product_id, item_id in rows:
+        by_cart_id[cart_id]['item_ids'][product_id] = item_id
+
+
+def flush_carts(cart_codes, evict=False):
+    """
+    Write the dirty cached carts among `cart_codes` to the database in one
+    transaction; with `evict`, also drop them from the cache so the database
+    becomes authoritative again. Returns the number of carts written.
+    """
+    keys = {_entry_key(cart_code): cart_code for cart_code in cart_codes}
+    cached = {keys[key]: entry for key, entry in cache.get_many(keys).items()}
+    entries = {cart_code: entry for cart_code, entry in cached.items() if entry['dirty']}
+    if entries:
+        with transaction.atomic():
+            _write_entries(entries)
+
+    for cart_code in cached:
+        try:
+            with _cart_lock(cart_code):
+                entry = cache.get(_entry_key(cart_code))
+                if entry is None:
+                    continue
+                flushed = entries.get(cart_code)
+                if flushed is not None and entry['rev'] != flushed['rev']:
+                    # Changed while being written: keep it dirty and log it again
+                    _log_dirty(cart_code)
+                elif evict:
+                    cache.delete(_entry_key(cart_code))
+                elif flushed is not None:
+                    entry.update(dirty=False, id=flushed['id'], item_ids=flushed['item_ids'])
+                    cache.set(_entry_key(cart_code), entry, settings.CART_CACHE_TIMEOUT)
+        except CartLocked:
+            if evict:
+                raise
+            # Busy: it stays dirty and the next cycle writes it again
+            _log_dirty(cart_code)
+    return len(entries)
+
+
+def flush_cart(cart_code):
+    """Write a cached cart back to the database and evict it (login, checkout)."""
+    if cache_store_enabled():
+        flush_carts([cart_code], evict=True)
+
+
+def flush_dirty_carts(chunk_size=500):
+    """
+    One write-behind cycle: flush every cart logged dirty since the last
+    cycle, chunk by chunk. Returns the number of carts written, or None if
+    another cycle is already running.
+    """
+    if not cache.add(FLUSH_LOCK_KEY, 1, timeout=300):
+        return None
+    try:
+        start = cache.get(FLUSHED_KEY, 0)
+        end = cache.get(DIRTY_SEQ_KEY, 0)
+        if end < start:
+            # The counter was evicted and restarted
+            start = 0
+        written = 0
+        for chunk_start in range(start + 1, end + 1, chunk_size):
+            chunk_end = min(chunk_start + chunk_size - 1, end)
+            keys = [_dirty_key(seq) for seq in range(chunk_start, chunk_end + 1)]
+            cart_codes = set(cache.get_many(keys).values())
+            written += flush_carts(cart_codes)
+            cache.delete_many(keys)
+            cache.set(FLUSHED_KEY, chunk_end, timeout=None)
+        return written
+    finally:
+        cache.delete(FLUSH_LOCK_KEY)
+
+
+class DatabaseCartStore:
+    """Carts read and written directly in the database."""
+
+    def get(self, cart_code, with_items=False):
+        flush_cart(cart_code)
+        queryset = Cart.objects.all()
+        if with_items:
+            queryset = queryset.prefetch_related(cart_items_prefetch())
+        return queryset.filter(cart_code=cart_code).first()
+
+    def get_or_create(self, cart_code, user=None):
+        # One SELECT for an existing cart; get_or_create also absorbs a racing INSERT
+        flush_cart(cart_code)
+        cart, _ = Cart.objects.get_or_create(cart_code=cart_code, defaults={'user': user})
+        return cart
+
+    def add_item(self, cart, product_id, quantity):
+        return add_cart_item(cart, product_id, quantity)
+
+    def set_quantity(self, cart, product_id, quantity):
+        return set_cart_item_quantity(cart, product_id, quantity)
+
+    def remove_item(self, cart, product_id):
+        return remove_cart_item(cart, product_id)
+
+    def clear(self, cart):
+        CartItem.objects.filter(cart=cart).delete()
+
+    def apply_operations(self, cart, operations):
+        return apply_cart_operations(cart, operations)
+
+    def save(self, cart, user=None):
+        # The owner is only written when it changes
+        if user is not None and cart.user_id != user.id:
+            touch_cart(cart, user=user)
+        else:
+            touch_cart(cart)
+
+    def load(self, cart):
+        return load_cart_items(cart)
+
+    def summary(self, cart_code):
+        flush_cart(cart_code)
+        return Cart.objects.only(*SUMMARY_FIELDS).filter(cart_code=cart_code).first()
+
+
+def _owned_in_database(method):
+    """Pass carts CacheCartStore.get() returned as database rows on to the database store."""
+    @wraps(method)
+    def wrapper(self, cart, *args, **kwargs):
+        if not hasattr(cart, '_entry'):
+            return getattr(database_store, method.__name__)(cart, *args, **kwargs)
+        return method(self, cart, *args, **kwargs)
+    return wrapper
+
+
+class CacheCartStore:
+    """
+    Anonymous carts held in the cache. Same interface as DatabaseCartStore;
+    every mutation is a locked read-modify-write of the cart's entry.
+
+    A cart owned by a user is never cached, even when an anonymous request
+    uses its cart_code. It stays in the database and goes through
+    DatabaseCartStore, whose touch_cart keeps the owner's product membership
+    current.
+    """
+
+    def _lookup(self, cart_code):
+        """
+        The cache entry for the cart, hydrated from its row on a miss; the Cart
+        row itself if a user owns it (those stay in the database); or None.
+        """
+        entry = cache.get(_entry_key(cart_code))
+        if entry is None:
+            cart = Cart.objects.filter(cart_code=cart_code).first()
+            if cart is None or cart.user_id is not None:
+                return cart
+            cache.add(_entry_key(cart_code), _entry_from_db(cart), settings.CART_CACHE_TIMEOUT)
+            entry = cache.get(_entry_key(cart_code))
+        return entry
+
+    def _cart(self, cart_code, entry):
+        cart = Cart(id=entry['id'], cart_code=cart_code, user=None)
+        cart.updated_at = datetime.fromtimestamp(entry['updated_at'], tz=dt_timezone.utc)
+        cart._entry = entry
+        return cart
+
+    @contextmanager
+    def _modify(self, cart):
+        """Lock the cart, yield its fresh items dict and save it if changed."""
+        with _cart_lock(cart.cart_code):
+            entry = self._lookup(cart.cart_code)
+            if not isinstance(entry, dict):
+                entry = cart._entry
+            items = dict(entry['items'])
+            yield items
+            if items != entry['items']:
+                entry['items'] = items
+                _assign_item_ids(entry)
+                _store_entry(cart.cart_code, entry)
+            cart._entry = entry
+
+    def get(self, cart_code, with_items=False):
+        entry = self._lookup(cart_code)
+        if isinstance(entry, Cart):
+            return load_cart_items(entry) if with_items else entry
+        if entry is None:
+            return None
+        cart = self._cart(cart_code, entry)
+        return self.load(cart) if with_items else cart
+
+    def get_or_create(self, cart_code, user=None):
+        cart = self.get(cart_code)
+        if cart is None:
+            # No row until the first flush; an empty cart that is never changed never gets one
+            entry = {
+                'id': _provisional_cart_id(), 'items': {}, 'item_ids': {},
+                'updated_at': time.time(), 'dirty': False, 'rev': 0,
+            }
+            cache.add(_entry_key(cart_code), entry, settings.CART_CACHE_TIMEOUT)
+            cart = self.get(cart_code)
+        return cart
+
+    @_owned_in_database
+    def add_item(self, cart, product_id, quantity):
+        if not Product.objects.filter(id=product_id).exists():
+            return False
+        with self._modify(cart) as items:
+            items[product_id] = items.get(product_id, 0) + quantity
+        return True
+
+    @_owned_in_database
+    def set_quantity(self, cart, product_id, quantity):
+        with self._modify(cart) as items:
+            if product_id not in items:
+                return False
+            if quantity <= 0:
+                del items[product_id]
+            else:
+                items[product_id] = quantity
+        return True
+
+    @_owned_in_database
+    def remove_item(self, cart, product_id):
+        with self._modify(cart) as items:
+            return items.pop(product_id, None) is not None
+
+    @_owned_in_database
+    def clear(self, cart):
+        with self._modify(cart) as items:
+            items.clear()
+
+    @_owned_in_database
+    def apply_operations(self, cart, operations):
+        final = fold_operations(operations)
+        wanted = {product_id for product_id, (absolute, quantity) in final.items() if not absolute or quantity > 0}
+        missing = wanted - set(Product.objects.filter(id__in=wanted).values_list('id', flat=True))
+        if missing:
+            return sorted(missing)
+        with self._modify(cart) as items:
+            for product_id, (absolute, quantity) in final.items():
+                if absolute and quantity <= 0:
+                    items.pop(product_id, None)
+                elif absolute:
+                    items[product_id] = quantity
+                else:
+                    items[product_id] = items.get(product_id, 0) + quantity
+        return []
+
+    @_owned_in_database
+    def save(self, cart, user=None):
+        # Mutations are stored as they happen; the cache store is anonymous-only
+        pass
+
+    @_owned_in_database
+    def load(self, cart):
+        """Attach CartItems built from the entry, with their products, like load_cart_items."""
+        items = cart._entry['items']
+        item_ids = cart._entry.get('item_ids', {})
+        products = Product.objects.in_bulk(list(items))
+        cartitems = CartItem.objects.all()
+        cartitems._result_cache = [
+            CartItem(id=item_ids.get(product_id), cart=cart, product=products[product_id], quantity=quantity)
+            for product_id, quantity in items.items() if product_id in products
+        ]
+        cartitems._prefetch_done = True
+        cart._prefetched_objects_cache = {'cartitems': cartitems}
+        return cart
+
+    def summary(self, cart_code):
+        entry = self._lookup(cart_code)
+        if isinstance(entry, Cart):
+            return database_store.summary(cart_code)
+        if entry is None:
+            return None
+        cart = self._cart(cart_code, entry)
+        prices = dict(Product.objects.filter(id__in=entry['items']).values_list('id', 'sale_price'))
+        items = {pid: quantity for pid, quantity in entry['items'].items() if pid in prices}
+        cart.item_count = len(items)
+        cart.total_quantity = sum(items.values())
+        cart.total_amount = sum((quantity * (prices[pid] or 0) for pid, quantity in items.items()), 0)
+        return cart
+
+
+database_store = DatabaseCartStore()
+cache_store = CacheCartStore()
+
+
+def cart_store_for(request):
+    """The cache store for anonymous requests when CART_STORE = 'cache', else the database store."""
+    if cache_store_enabled() and not request.user.is_authenticated:
+        return cache_store
+    return database_store
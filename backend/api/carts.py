@@ -0,0 +1,283 @@
+"""
+Cart write and read helpers shared by the cart views.
+
+Item quantities are changed with single-statement upserts so concurrent
+requests for the same (cart, product) never lose increments. Every change is
+followed by `touch_cart`, which also refreshes the cart's denormalized
+item_count / total_quantity / total_amount in the same UPDATE.
+"""
+from django.db import IntegrityError, connection, transaction
+from django.db.models import (
+    Count, DecimalField, F, IntegerField, OuterRef, Prefetch, Subquery, Sum, Value, prefetch_related_objects,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .membership import invalidate_membership
+from .models import Cart, CartItem, Product
+
+
+def cart_items_prefetch():
+    return Prefetch('cartitems', queryset=CartItem.objects.select_related('product').order_by('id'))
+
+
+def load_cart_items(cart):
+    """
+    Attach the cart's items and their products in a single query so that
+    CartSerializer (items, sub totals and cart total) runs without further queries.
+    """
+    prefetch_related_objects([cart], cart_items_prefetch())
+    return cart
+
+
+TOTAL_FIELDS = ('item_count', 'total_quantity', 'total_amount')
+
+
+def _items_aggregate(aggregate, output_field):
+    items = CartItem.objects.filter(cart=OuterRef('pk')).order_by().values('cart')
+    return Coalesce(Subquery(items.annotate(value=aggregate).values('value')), Value(0), output_field=output_field)
+
+
+def cart_totals():
+    """Cart.objects.update() expressions recomputing TOTAL_FIELDS from the cart's own items."""
+    return {
+        'item_count': _items_aggregate(Count('id'), IntegerField()),
+        'total_quantity': _items_aggregate(Sum('quantity'), IntegerField()),
+        'total_amount': _items_aggregate(
+            Sum(F('quantity') * F('product__sale_price')),
+            DecimalField(max_digits=12, decimal_places=2),
+        ),
+    }
+
+
+def touch_cart(cart, **changes):
+    """
+    After an item change: bump Cart.updated_at (it backs get_cart's ETag /
+    Last-Modified), refresh the cart totals and apply any other column
+    `changes`, e.g. a new owner, all in one UPDATE. Also invalidates the
+    owner's cached product membership.
+    """
+    changes['updated_at'] = timezone.now()
+    Cart.objects.filter(pk=cart.pk).update(**cart_totals(), **changes)
+    if 'user' in changes and cart.user_id:
+        invalidate_membership(cart.user_id)
+    for name, value in changes.items():
+        setattr(cart, name, value)
+    for name in TOTAL_FIELDS:
+        # Computed in the database; deferred so the next access reloads them
+        cart.__dict__.pop(name, None)
+    if cart.user_id:
+        invalidate_membership(cart.user_id)
+
+
+def refresh_cart_totals(carts):
+    """
+    Recompute the totals of `carts` (a Cart queryset) after a change made
+    outside the cart views: a price change, a deleted product, an admin edit.
+    Like touch_cart, it bumps updated_at so cached ETags stop matching, and
+    invalidates the owners' product membership.
+    """
+    user_ids = set(carts.exclude(user=None).values_list('user_id', flat=True))
+    updated = carts.update(**cart_totals(), updated_at=timezone.now())
+    for user_id in user_ids:
+        invalidate_membership(user_id)
+    return updated
+
+
+def _increment_sql(insert):
+    """`insert` INTO cartitems, adding to the quantity of rows that already exist."""
+    item_table = connection.ops.quote_name(CartItem._meta.db_table)
+    if connection.vendor in ('postgresql', 'sqlite'):
+        return (
+            f'{insert} ON CONFLICT (cart_id, product_id) '
+            f'DO UPDATE SET quantity = {item_table}.quantity + excluded.quantity'
+        )
+    if connection.vendor == 'mysql':
+        return f'{insert} ON DUPLICATE KEY UPDATE quantity = {item_table}.quantity + VALUES(quantity)'
+    return None
+
+
+def add_cart_item(cart, product_id, quantity):
+    """
+    Add `quantity` of a product to the cart in one statement, inserting the
+    item or incrementing the existing one. Returns False if the product does
+    not exist.
+    """
+    item_table = connection.ops.quote_name(CartItem._meta.db_table)
+    product_table = connection.ops.quote_name(Product._meta.db_table)
+    # Selecting from products makes a missing product insert nothing instead of
+    # tripping the (deferred) foreign key check.
+    sql = _increment_sql(
+        f'INSERT INTO {item_table} (cart_id, product_id, quantity) '
+        f'SELECT %s, id, %s FROM {product_table} WHERE id = %s'
+    )
+    if sql is not None:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [cart.pk, quantity, product_id])
+            return cursor.rowcount > 0
+
+    # Portable fallback: increment, else insert and retry the increment on a race.
+    items = CartItem.objects.filter(cart=cart, product_id=product_id)
+    if items.update(quantity=F('quantity') + quantity):
+        return True
+    if not Product.objects.filter(id=product_id).exists():
+        return False
+    try:
+        with transaction.atomic():
+            CartItem.objects.create(cart=cart, product_id=product_id, quantity=quantity)
+    except IntegrityError:
+        items.update(quantity=F('quantity') + quantity)
+    return True
+
+
+def set_cart_item_quantity(cart, product_id, quantity):
+    """
+    Set an existing item's quantity (deleting it when quantity <= 0).
+    Returns False if the product is not in the cart.
+    """
+    items = CartItem.objects.filter(cart=cart, product_id=product_id)
+    if quantity <= 0:
+        return items.delete()[0] > 0
+    return items.update(quantity=quantity) > 0
+
+
+def remove_cart_item(cart, product_id):
+    return CartItem.objects.filter(cart=cart, product_id=product_id).delete()[0] > 0
+
+
+def add_cart_items(cart, quantities):
+    """Bulk add_cart_item for {product_id: quantity} of products known to exist."""
+    item_table = connection.ops.quote_name(CartItem._meta.db_table)
+    values = ', '.join(['(%s, %s, %s)'] * len(quantities))
+    sql = _increment_sql(f'INSERT INTO {item_table} (cart_id, product_id, quantity) VALUES {values}')
+    if sql is None:
+        for product_id, quantity in quantities.items():
+            add_cart_item(cart, product_id, quantity)
+        return
+    params = []
+    for product_id, quantity in quantities.items():
+        params += [cart.pk, product_id, quantity]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def set_cart_items(cart, quantities):
+    """Create or overwrite items with the given absolute {product_id: quantity}."""
+    features = connection.features
+    items = [CartItem(cart=cart, product_id=product_id, quantity=quantity) for product_id, quantity in quantities.items()]
+    if not features.supports_update_conflicts:
+        for item in items:
+            CartItem.objects.update_or_create(cart=cart, product_id=item.product_id, defaults={'quantity': item.quantity})
+        return
+    CartItem.objects.bulk_create(
+        items,
+        update_conflicts=True,
+        unique_fields=['cart', 'product'] if features.supports_update_conflicts_with_target else None,
+        update_fields=['quantity'],
+    )
+
+
+def fold_operations(operations):
+    """
+    Collapse ordered add/set/remove operations into one final action per
+    product: (absolute, quantity), where absolute=False means "add quantity to
+    whatever is there" and an absolute quantity <= 0 means "remove".
+    """
+    final = {}
+    for operation in operations:
+        product_id = operation['product_id']
+        if operation['op'] == 'add':
+            absolute, quantity = final.get(product_id, (False, 0))
+            final[product_id] = (absolute, max(quantity, 0) + operation['quantity'])
+        elif operation['op'] == 'set':
+            final[product_id] = (True, operation['quantity'])
+        else:
+            final[product_id] = (True, 0)
+    return final
+
+
+def apply_cart_operations(cart, operations):
+    """
+    Apply validated CartOperationSerializer data to the cart atomically, with
+    at most one statement per kind of change (delete, set, add) plus one product
+    existence check. Returns the sorted ids of unknown products, in which case
+    nothing is changed.
+    """
+    final = fold_operations(operations)
+    removed = [product_id for product_id, (absolute, quantity) in final.items() if absolute and quantity <= 0]
+    absolutes = {product_id: quantity for product_id, (absolute, quantity) in final.items() if absolute and quantity > 0}
+    increments = {product_id: quantity for product_id, (absolute, quantity) in final.items() if not absolute}
+
+    wanted = absolutes.keys() | increments.keys()
+    if wanted:
+        missing = wanted - set(Product.objects.filter(id__in=wanted).values_list('id', flat=True))
+        if missing:
+            return sorted(missing)
+
+    with transaction.atomic():
+        if removed:
+            CartItem.objects.filter(cart=cart, product_id__in=removed).delete()
+        if absolutes:
+            set_cart_items(cart, absolutes)
+        if increments:
+            add_cart_items(cart, increments)
+    return []
+
+
+def merge_carts(target, source_ids):
+    """
+    Fold the carts `source_ids` into `target` with set-based statements:
+    quantities of products already in the target are summed, the other
+    products are copied over (summed across sources), and the sources are
+    deleted. The number of queries does not depend on cart sizes.
+    """
+    item_table = connection.ops.quote_name(CartItem._meta.db_table)
+    source_items = CartItem.objects.filter(cart_id__in=source_ids)
+    source_totals = (
+        source_items.filter(product_id=OuterRef('product_id'))
+        .order_by().values('product_id').annotate(total=Sum('quantity')).values('total')
+    )
+    placeholders = ', '.join(['%s'] * len(source_ids))
+
+    with transaction.atomic():
+        # Overlapping products first, so the copy below cannot be counted twice
+        CartItem.objects.filter(cart=target, product_id__in=source_items.values('product_id')).update(
+            quantity=F('quantity') + Subquery(source_totals)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {item_table} (cart_id, product_id, quantity) '
+                f'SELECT %s, product_id, SUM(quantity) FROM {item_table} '
+                f'WHERE cart_id IN ({placeholders}) '
+                f'AND product_id NOT IN (SELECT product_id FROM {item_table} WHERE cart_id = %s) '
+                f'GROUP BY product_id',
+                [target.pk, *source_ids, target.pk],
+            )
+        Cart.objects.filter(id__in=source_ids).delete()
+
+
+def merge_user_carts(user, cart_code=None):
+    """
+    Give `user` a single cart: their most recently updated cart absorbs the
+    anonymous cart `cart_code` (if any) and the user's other carts. Carts
+    owned by someone else are never touched. Returns the user's cart, or
+    None if they have none.
+    """
+    carts = Cart.objects.filter(user=user)
+    if cart_code:
+        carts = carts | Cart.objects.filter(cart_code=cart_code, user__isnull=True)
+    carts = list(carts.only('id', 'user_id', 'cart_code', 'updated_at').order_by('-updated_at', '-id'))
+    if not carts:
+        return None
+
+    # The user's own latest cart wins; an anonymous cart only when they have none
+    owned = [cart for cart in carts if cart.user_id == user.id]
+    target = owned[0] if owned else carts[0]
+    source_ids = [cart.pk for cart in carts if cart.pk != target.pk]
+    if source_ids:
+        merge_carts(target, source_ids)
+    if target.user_id != user.id:
+        touch_cart(target, user=user)
+    elif source_ids:
+        touch_cart(target)
+    return target
@@ -0,0 +1,35 @@
+"""System checks for settings that only work with a shared cache backend."""
+from django.conf import settings
+from django.core.checks import Error, Warning, register
+
+from .cache import cache_is_shared
+
+
+@register()
+def cart_store_cache_check(app_configs, **kwargs):
+    if settings.CART_STORE != 'cache' or cache_is_shared():
+        return []
+    return [Error(
+        "CART_STORE = 'cache' needs a cache shared between processes.",
+        hint=(
+            'With a per-process cache (LocMemCache) each worker sees its own carts and '
+            '`manage.py flush_carts` sees none of them. Set CACHE_BACKEND (e.g. Redis) '
+            "or use CART_STORE = 'db'."
+        ),
+        id='api.E001',
+    )]
+
+
+@register(deploy=True)
+def shared_cache_check(app_configs, **kwargs):
+    if cache_is_shared():
+        return []
+    return [Warning(
+        'The default cache is per-process (LocMemCache) or a DummyCache.',
+        hint=(
+            'Refresh-token blacklist checks and request users are not cached, so every '
+            'authenticated request loads its user row. Use a shared backend '
+            '(CACHE_BACKEND, e.g. Redis) in production.'
+        ),
+        id='api.W001',
+    )]
@@ -0,0 +1,84 @@
+"""
+Validators for conditional GET (ETag / Last-Modified), used with Django's
+`condition` decorator. Each one costs at most a single indexed lookup and never
+serializes the body, so a matching If-None-Match / If-Modified-Since returns
+304 without touching the serializers.
+
+ETags are weak: the gzip and browsable-API renderings of a resource share one.
+"""
+import hashlib
+from datetime import datetime, timezone as dt_timezone
+
+from django.db.models import Max
+
+from .cache import get_catalog_version, normalized_query
+from .cart_store import cached_cart_entry
+from .models import Cart, Product
+
+
+def _query_digest(request):
+    return hashlib.md5(normalized_query(request).encode('utf-8')).hexdigest()[:12]
+
+
+def catalog_etag(request, *args, **kwargs):
+    """Product list pages and category_detail: catalog version + query string."""
+    return f'W/"v{get_catalog_version()}-{_query_digest(request)}"'
+
+
+def _product_updated_at(request, slug):
+    if not hasattr(request, '_product_updated_at'):
+        request._product_updated_at = (
+            Product.objects.filter(slug=slug).values_list('updated_at', flat=True).first()
+        )
+    return request._product_updated_at
+
+
+def product_etag(request, slug, *args, **kwargs):
+    updated_at = _product_updated_at(request, slug)
+    if updated_at is None:
+        return None
+    return f'W/"p{updated_at.timestamp()}-{_query_digest(request)}"'
+
+
+def product_last_modified(request, slug, *args, **kwargs):
+    return _product_updated_at(request, slug)
+
+
+def _cart_state(request):
+    """(cart id, cart updated_at, products stamp, Last-Modified) or None."""
+    if not hasattr(request, '_cart_state'):
+        cart_code = request.GET.get('cart_code')
+        entry = cart_code and cached_cart_entry(cart_code)
+        if entry:
+            # Held by the cache store (api/cart_store.py): there is no products
+            # timestamp to hand, so product changes show up through the catalog
+            # version in the ETag, and no Last-Modified is sent.
+            updated_at = datetime.fromtimestamp(entry['updated_at'], tz=dt_timezone.utc)
+            request._cart_state = (entry['id'], updated_at, f'v{get_catalog_version()}', None)
+        else:
+            row = cart_code and (
+                Cart.objects.filter(cart_code=cart_code)
+                .annotate(products_updated_at=Max('cartitems__product__updated_at'))
+                .values_list('id', 'updated_at', 'products_updated_at')
+                .first()
+            )
+            if row:
+                cart_id, updated_at, products_updated_at = row
+                products_stamp = products_updated_at.timestamp() if products_updated_at else 0
+                last_modified = max(filter(None, (updated_at, products_updated_at)))
+                row = (cart_id, updated_at, products_stamp, last_modified)
+            request._cart_state = row
+    return request._cart_state
+
+
+def cart_etag(request, *args, **kwargs):
+    state = _cart_state(request)
+    if not state:
+        return None
+    cart_id, updated_at, products_stamp, _ = state
+    return f'W/"c{cart_id}-{updated_at.timestamp()}-{products_stamp}"'
+
+
+def cart_last_modified(request, *args, **kwargs):
+    state = _cart_state(request)
+    return state[3] if state else None
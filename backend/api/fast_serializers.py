@@ -0,0 +1,195 @@
+"""
+Compiled fast path for the read-only catalog serializers.
+
+`CompiledSerializer` looks at a ModelSerializer's fields once, builds a plain
+converter per field, and then turns `.values()` rows (or model instances)
+straight into dicts. It skips DRF's per-field get_attribute/to_representation
+dispatch but produces the same output, so the rendered JSON is byte-identical.
+
+Enabled with the FAST_SERIALIZATION setting; `manage.py benchmark_serializers`
+compares both paths and verifies the output matches.
+"""
+import decimal
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import QuerySet
+from rest_framework import fields as drf_fields
+from rest_framework import relations
+from rest_framework.settings import api_settings
+
+URL_CACHE_SIZE = 4096
+
+
+def fast_serialization_enabled():
+    return settings.FAST_SERIALIZATION
+
+
+def _decimal_converter(field):
+    coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    if not coerce_to_string or field.localize or field.normalize_output or field.decimal_places is None:
+        return lambda value, env: field.to_representation(value)
+
+    exponent = decimal.Decimal('.1') ** field.decimal_places
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    rounding = field.rounding
+
+    def convert(value, env):
+        if not isinstance(value, decimal.Decimal):
+            value = decimal.Decimal(str(value).strip())
+        return f'{value.quantize(exponent, rounding=rounding, context=context):f}'
+    return convert
+
+
+def _file_converter(field, model_field):
+    storage = model_field.storage
+    use_url = getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL)
+    relative_url = lru_cache(maxsize=URL_CACHE_SIZE)(storage.url)
+    # storage.url() + build_absolute_uri() dominate the cost of a row and image
+    # names repeat across requests, so memoize them per (site root, name).
+    absolute_urls = {}
+
+    def convert(value, env):
+        name = getattr(value, 'name', value)
+        if not name:
+            return None
+        if not use_url:
+            return name
+        url = relative_url(name)
+        if env.request is None:
+            return url
+        if not (url.startswith('/') and not url.startswith('//') or '://' in url):
+            # Resolved against the request path, so not shareable
+            return env.request.build_absolute_uri(url)
+        key = (env.root, name)
+        absolute = absolute_urls.get(key)
+        if absolute is None:
+            if len(absolute_urls) >= URL_CACHE_SIZE:
+                absolute_urls.clear()
+            absolute = absolute_urls[key] = env.request.build_absolute_uri(url)
+        return absolute
+    return convert
+
+
+class _Env:
+    """Per-call rendering state shared by the converters."""
+
+    def __init__(self, request):
+        self.request = request
+        self.root = request.build_absolute_uri('/') if request is not None else None
+
+
+def _identity(value, env):
+    return value
+
+
+def _converter(field, model_field):
+    if isinstance(field, drf_fields.FileField):
+        return _file_converter(field, model_field)
+    if isinstance(field, drf_fields.DecimalField):
+        return _decimal_converter(field)
+    if isinstance(field, relations.PrimaryKeyRelatedField):
+        return _identity
+    if type(field) in (drf_fields.CharField, drf_fields.SlugField, drf_fields.IntegerField):
+        # str()/int() of a value that already is a str/int
+        return _identity
+    if type(field) is drf_fields.FloatField:
+        return lambda value, env: float(value)
+    return lambda value, env: field.to_representation(value)
+
+
+@lru_cache(maxsize=None)
+def compile_serializer(serializer_class, field_names):
+    """
+    [(output name, row key, instance attname, converter)] for `field_names`.
+    Only plain model-backed fields are supported.
+    """
+    model = serializer_class.Meta.model
+    prototype = serializer_class()
+    compiled = []
+    for name in field_names:
+        field = prototype.fields[name]
+        source = field.source
+        if field.write_only:
+            continue
+        if '.' in source or source == '*' or isinstance(field, drf_fields.SerializerMethodField):
+            raise ImproperlyConfigured(
+                f'{serializer_class.__name__}.{name} cannot be compiled; only model fields are supported'
+            )
+        model_field = model._meta.get_field(source)
+        compiled.append((name, source, model_field.attname, _converter(field, model_field)))
+    return tuple(compiled)
+
+
+class CompiledSerializer:
+    """
+    Minimal stand-in for `serializer_class(instance, many=..., context=...)`
+    exposing `.data`. QuerySets are read with `.values()` so no model
+    instances are built at all.
+    """
+
+    def __init__(self, serializer_class, instance=None, many=False, context=None):
+        self.serializer_class = serializer_class
+        self.instance = instance
+        self.many = many
+        self.context = context or {}
+
+    def field_names(self):
+        request = self.context.get('request')
+        if request is not None and hasattr(self.serializer_class, 'selected_fields'):
+            return tuple(self.serializer_class.selected_fields(request))
+        return tuple(self.serializer_class.Meta.fields)
+
+    @property
+    def data(self):
+        compiled = compile_serializer(self.serializer_class, self.field_names())
+        env = _Env(self.context.get('request'))
+
+        rows = self.instance
+        if isinstance(rows, QuerySet):
+            rows = rows.values(*[source for _, source, _, _ in compiled])
+        if not self.many:
+            return self.to_representation(rows, compiled, env)
+        return [self.to_representation(row, compiled, env) for row in rows]
+
+    @staticmethod
+    def to_representation(row, compiled, env):
+        ret = {}
+        if isinstance(row, dict):
+            for name, source, _, convert in compiled:
+                value = row[source]
+                ret[name] = None if value is None else convert(value, env)
+        else:
+            for name, _, attname, convert in compiled:
+                value = getattr(row, attname)
+                ret[name] = None if value is None else convert(value, env)
+        return ret
+
+
+def read_serializer(serializer_class, instance=None, many=False, context=None):
+    """The compiled serializer when FAST_SERIALIZATION is on, the DRF one otherwise."""
+    if fast_serialization_enabled():
+        return CompiledSerializer(serializer_class, instance, many=many, context=context)
+    return serializer_class(instance, many=many, context=context)
+
+
+class FastSerializationMixin:
+    """
+    GenericAPIView mixin: when FAST_SERIALIZATION is on, `get_serializer()`
+    returns a CompiledSerializer and `as_rows()` turns the queryset into
+    `.values()` rows so no model instances are built.
+    """
+
+    def as_rows(self, queryset, columns):
+        if not fast_serialization_enabled():
+            return queryset
+        return queryset.values('id', *columns)
+
+    def get_serializer(self, *args, **kwargs):
+        if not fast_serialization_enabled():
+            return super().get_serializer(*args, **kwargs)
+        kwargs.setdefault('context', self.get_serializer_context())
+        return CompiledSerializer(self.get_serializer_class(), *args, **kwargs)
@@ -0,0 +1,180 @@
+"""
+Materialized homepage feed.
+
+Each section (featured, top rated, newest per category) is stored in a
+FeedSection row as the exact JSON the API returns, together with the ids it
+contains. Product/Category signals rebuild only the sections a change can
+affect, once the write has committed, so serving the feed is one query plus
+string concatenation.
+"""
+import logging
+
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from .models import Category, FeedSection, Product
+from .serializers import ProductListSerializer
+
+SECTION_SIZE = 12
+CATEGORY_SECTION_SIZE = 8
+
+FEATURED = 'featured'
+TOP_RATED = 'top_rated'
+
+logger = logging.getLogger(__name__)
+
+
+def category_key(category_id):
+    return f'category:{category_id}'
+
+
+def _in_stock():
+    return Product.objects.filter(stock__gt=0)
+
+
+def _render(data):
+    return JSONRenderer().render(data).decode('utf-8')
+
+
+def _store(key, products, payload, sort_key=''):
+    FeedSection.objects.update_or_create(
+        key=key,
+        defaults={
+            'sort_key': sort_key,
+            'payload': _render(payload),
+            'product_ids': [product.pk for product in products],
+        },
+    )
+
+
+def build_featured():
+    products = list(_in_stock().filter(featured=True).order_by('-created_at', '-id')[:SECTION_SIZE])
+    _store(FEATURED, products, ProductListSerializer(products, many=True).data)
+
+
+def build_top_rated():
+    products = list(_in_stock().order_by('-rating', '-reviews_count', '-id')[:SECTION_SIZE])
+    _store(TOP_RATED, products, ProductListSerializer(products, many=True).data)
+
+
+def build_category(category):
+    products = list(
+        _in_stock().filter(category=category).order_by('-created_at', '-id')[:CATEGORY_SECTION_SIZE]
+    )
+    payload = {
+        'slug': category.slug,
+        'name': category.name,
+        'products': ProductListSerializer(products, many=True).data,
+    }
+    _store(category_key(category.pk), products, payload, sort_key=category.name.lower())
+
+
+def rebuild_feed():
+    """Rebuild every section, e.g. after bulk imports that bypass signals."""
+    build_featured()
+    build_top_rated()
+    categories = list(Category.objects.all())
+    for category in categories:
+        build_category(category)
+    FeedSection.objects.filter(key__startswith='category:').exclude(
+        key__in=[category_key(category.pk) for category in categories]
+    ).delete()
+
+
+def _after_commit(description, func):
+    """
+    Run `func` once the current transaction commits. A failed rebuild only
+    leaves a section stale; it is logged and never aborts the write itself.
+    """
+    def run():
+        try:
+            func()
+        except Exception:
+            logger.exception('Could not refresh the feed after %s', description)
+
+    transaction.on_commit(run)
+
+
+def _candidate_keys(category_ids):
+    """The sections a product can be in: featured, top rated and its category's."""
+    return {FEATURED, TOP_RATED} | {category_key(pk) for pk in category_ids if pk}
+
+
+def _sections_containing(product_id, candidates):
+    return {
+        key for key, ids in FeedSection.objects.filter(key__in=candidates).values_list('key', 'product_ids')
+        if product_id in ids
+    }
+
+
+def product_saved(product, created):
+    """Rebuild the sections `product` is in, or can newly enter after this save."""
+    keys = set()
+    in_stock = product.stock > 0
+
+    def changed(name):
+        return created or product.field_changed(name)
+
+    if in_stock and product.featured and (changed('featured') or changed('stock')):
+        keys.add(FEATURED)
+    if in_stock and (changed('rating') or changed('stock')):
+        keys.add(TOP_RATED)
+    if in_stock and product.category_id and (changed('category') or changed('stock')):
+        keys.add(category_key(product.category_id))
+
+    # Decided now: the loaded-row snapshot is reset once save() returns
+    product_id = product.pk
+    candidates = _candidate_keys({product.category_id, getattr(product, '_loaded_values', {}).get('category_id')})
+    _after_commit(
+        f'saving product {product_id}',
+        lambda: _rebuild(keys | _sections_containing(product_id, candidates)),
+    )
+
+
+def product_deleted(product):
+    product_id = product.pk
+    candidates = _candidate_keys({product.category_id})
+    _after_commit(
+        f'deleting product {product_id}',
+        lambda: _rebuild(_sections_containing(product_id, candidates)),
+    )
+
+
+def category_saved(category):
+    # Via _rebuild, which re-reads the category in case it is gone by commit time
+    key = category_key(category.pk)
+    _after_commit(f'saving category {category.pk}', lambda: _rebuild({key}))
+
+
+def category_deleted(category):
+    FeedSection.objects.filter(key=category_key(category.pk)).delete()
+
+
+def _rebuild(keys):
+    for key in keys:
+        if key == FEATURED:
+            build_featured()
+        elif key == TOP_RATED:
+            build_top_rated()
+        else:
+            category = Category.objects.filter(pk=int(key.split(':', 1)[1])).first()
+            if category is None:
+                FeedSection.objects.filter(key=key).delete()
+            else:
+                build_category(category)
+
+
+def feed_json():
+    """The whole feed as a JSON string, assembled from the stored sections."""
+    sections = list(FeedSection.objects.order_by('sort_key', 'key').values_list('key', 'payload'))
+    if not sections:
+        rebuild_feed()
+        sections = list(FeedSection.objects.order_by('sort_key', 'key').values_list('key', 'payload'))
+
+    payloads = dict(sections)
+    categories = [payload for key, payload in sections if key.startswith('category:')]
+    return (
+        '{"featured":' + payloads.get(FEATURED, '[]') +
+        ',"top_rated":' + payloads.get(TOP_RATED, '[]') +
+        ',"categories":[' + ','.join(categories) + ']}'
+    )
@@ -1,6 +1,10 @@
+from django.db.models import Case, Count, IntegerField, Value, When
 from django_filters import rest_framework as filters
 from .models import Product
 
+# Lower bounds of the sale_price histogram buckets; the last one is open-ended.
+PRICE_BUCKETS = [0, 25, 50, 100, 250, 500, 1000]
+
 class ProductFilter(filters.FilterSet):
     min_price = filters.NumberFilter(field_name="sale_price", lookup_expr='gte')
     max_price = filters.NumberFilter(field_name="sale_price", lookup_expr='lte')
@@ -10,3 +14,51 @@ class ProductFilter(filters.FilterSet):
     class Meta:
         model = Product
         fields = ['category', 'featured', 'min_price', 'max_price']
+
+
+def facet_counts(queryset):
+    """
+    Category, featured and price-bucket counts for an already filtered product
+    queryset, computed with a single GROUP BY (category, featured, bucket) query.
+    """
+    bucket = Case(
+        *[When(sale_price__lt=upper, then=Value(index)) for index, upper in enumerate(PRICE_BUCKETS[1:])],
+        default=Value(len(PRICE_BUCKETS) - 1),
+        output_field=IntegerField(),
+    )
+    rows = (
+        queryset.order_by()
+        .annotate(price_bucket=bucket)
+        .values('category__slug', 'category__name', 'featured', 'price_bucket')
+        .annotate(count=Count('id'))
+    )
+
+    total = 0
+    categories = {}
+    featured = {'true': 0, 'false': 0}
+    prices = [0] * len(PRICE_BUCKETS)
+    for row in rows:
+        count = row['count']
+        total += count
+        if row['category__slug'] is not None:
+            category = categories.setdefault(
+                row['category__slug'],
+                {'slug': row['category__slug'], 'name': row['category__name'], 'count': 0},
+            )
+            category['count'] += count
+        featured['true' if row['featured'] else 'false'] += count
+        prices[row['price_bucket']] += count
+
+    return {
+        'total': total,
+        'categories': sorted(categories.values(), key=lambda c: (-c['count'], c['slug'])),
+        'featured': featured,
+        'price': [
+            {
+                'min': lower,
+                'max': PRICE_BUCKETS[index + 1] if index + 1 < len(PRICE_BUCKETS) else None,
+                'count': prices[index],
+            }
+            for index, lower in enumerate(PRICE_BUCKETS)
+        ],
+    }
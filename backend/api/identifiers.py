@@ -0,0 +1,107 @@
+"""
+Unique slug / username allocation.
+
+Free values are derived from a base as `base`, `base-1`, `base-2`, ... (the
+separator is configurable). All values already taken for a set of bases are
+read with one regex query, and the next suffix is picked after the highest
+one in use, so a popular base costs a single query instead of one per
+collision. A concurrent insert can still claim the same value first;
+`with_unique_value` then retries with a freshly allocated one.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+ATTEMPTS = 5
+# Bases per regex query when allocating in bulk
+BULK_QUERY_SIZE = 100
+_REGEX_SPECIAL = set('.^$*+?()[]{}|\\-')
+
+
+def _regex_escape(value):
+    # Only escapes metacharacters, so the pattern means the same to the
+    # PostgreSQL, MySQL and SQLite (Python re) regex engines
+    return ''.join(f'\\{char}' if char in _REGEX_SPECIAL else char for char in value)
+
+
+def _split_suffixes(value, separator):
+    """Every (base, n) with value == f'{base}{separator}{n}'."""
+    digits_start = len(value.rstrip('0123456789'))
+    for start in range(digits_start, len(value)):
+        head = value[:start]
+        if head.endswith(separator):
+            yield head[:len(head) - len(separator)], int(value[start:])
+
+
+def _taken_values(model, field, bases, separator):
+    pattern = f'^{{}}({_regex_escape(separator)}[0-9]+)?$'
+    taken = set()
+    bases = sorted(bases)
+    for start in range(0, len(bases), BULK_QUERY_SIZE):
+        query = Q()
+        for base in bases[start:start + BULK_QUERY_SIZE]:
+            # The prefix match lets the database use the column's index
+            query |= Q(**{f'{field}__startswith': base, f'{field}__regex': pattern.format(_regex_escape(base))})
+        taken.update(model._default_manager.filter(query).values_list(field, flat=True))
+    return taken
+
+
+def unique_values(model, field, bases, separator='-'):
+    """
+    A free value of `model.field` for each of `bases`, in order, distinct from
+    each other and from every stored value. One query per BULK_QUERY_SIZE
+    distinct bases.
+    """
+    max_length = model._meta.get_field(field).max_length
+    bases = [base[:max_length] if max_length else base for base in bases]
+    taken = _taken_values(model, field, set(bases), separator)
+    wanted = set(bases)
+
+    # Next suffix per base: one past the highest in use
+    next_suffix = {}
+    for value in taken:
+        for base, n in [(value, 0), *_split_suffixes(value, separator)]:
+            if base in wanted:
+                next_suffix[base] = max(next_suffix.get(base, 0), n + 1)
+
+    allocated = []
+    for base in bases:
+        n = next_suffix.get(base, 0)
+        while True:
+            suffix = f'{separator}{n}' if n else ''
+            candidate = base[:max_length - len(suffix)] + suffix if max_length else base + suffix
+            if candidate not in taken:
+                break
+            n += 1
+        next_suffix[base] = n + 1
+        taken.add(candidate)
+        allocated.append(candidate)
+    return allocated
+
+
+def unique_value(model, field, base, separator='-'):
+    """A free value of `model.field` derived from `base`."""
+    return unique_values(model, field, [base], separator)[0]
+
+
+def with_unique_value(model, field, base, write, separator='-'):
+    """
+    Call `write(value)` with a free value derived from `base` and return its
+    result. If a concurrent insert takes the value first, allocate again.
+    """
+    for attempt in range(ATTEMPTS):
+        value = unique_value(model, field, base, separator)
+        try:
+            with transaction.atomic():
+                return write(value)
+        except IntegrityError:
+            clashed = model._default_manager.filter(**{field: value}).exists()
+            if not clashed or attempt == ATTEMPTS - 1:
+                raise
+
+
+def save_with_unique_value(instance, field, base, save, separator='-'):
+    """Set `instance.<field>` to a free value derived from `base` and `save()` it."""
+    def write(value):
+        setattr(instance, field, value)
+        save()
+    with_unique_value(type(instance), field, base, write, separator)
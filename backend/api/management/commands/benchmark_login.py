@@ -0,0 +1,83 @@
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+User = get_user_model()
+EMAIL = 'benchmark-login@example.com'
+PASSWORD = 'benchmark-password'
+CASES = [
+    ('valid', EMAIL, PASSWORD),
+    ('wrong password', EMAIL, 'not-the-password'),
+    ('unknown email', 'nobody@example.com', PASSWORD),
+]
+
+
+@contextmanager
+def count_hashes():
+    """Count outermost encode()/verify() calls of the default password hasher."""
+    hasher_class = type(get_hasher())
+    originals = {name: getattr(hasher_class, name) for name in ('encode', 'verify')}
+    counter = {'hashes': 0, 'depth': 0}
+
+    def counting(original):
+        def wrapper(*args, **kwargs):
+            # PBKDF2's verify() calls encode(); count the pair once
+            counter['depth'] += 1
+            if counter['depth'] == 1:
+                counter['hashes'] += 1
+            try:
+                return original(*args, **kwargs)
+            finally:
+                counter['depth'] -= 1
+        return wrapper
+
+    for name, original in originals.items():
+        setattr(hasher_class, name, counting(original))
+    try:
+        yield counter
+    finally:
+        for name, original in originals.items():
+            setattr(hasher_class, name, original)
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark authenticate() for valid, wrong-password and unknown-email logins: '
+        'password hashes per attempt and attempts/sec on one core'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help='Attempts per case')
+        parser.add_argument(
+            '--backends',
+            help='Comma separated AUTHENTICATION_BACKENDS to benchmark instead of the configured ones',
+        )
+
+    def handle(self, *args, **options):
+        backends = options['backends']
+        overrides = {'AUTHENTICATION_BACKENDS': backends.split(',')} if backends else {}
+
+        # The benchmark user is rolled back at the end.
+        with transaction.atomic(), override_settings(**overrides):
+            User.objects.create_user(username='benchmark-login', email=EMAIL, password=PASSWORD)
+            self.stdout.write(f'Hasher: {get_hasher().algorithm}, {options["iterations"]} attempts per case')
+            for label, email, password in CASES:
+                self.run_case(label, email, password, options['iterations'])
+            transaction.set_rollback(True)
+
+    def run_case(self, label, email, password, iterations):
+        with count_hashes() as counter:
+            started = time.perf_counter()
+            for _ in range(iterations):
+                authenticate(None, email=email, password=password)
+            elapsed = time.perf_counter() - started
+        # Hashing is CPU bound and runs single threaded here, so this is per core
+        self.stdout.write(
+            f'{label:>15}: {counter["hashes"] / iterations:.1f} hashes/attempt, '
+            f'{elapsed / iterations * 1000:7.2f} ms/attempt, {iterations / elapsed:8.1f} attempts/sec/core'
+        )
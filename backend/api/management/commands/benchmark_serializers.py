@@ -0,0 +1,89 @@
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from api.fast_serializers import CompiledSerializer
+from api.models import Category, Product
+from api.serializers import CategoryListSerializer, ProductDetailSerializer, ProductListSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Micro-benchmark DRF serializers against the compiled fast path on catalog pages '
+        'and verify both render byte-identical JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-sizes', default='20,100', help='Comma separated page sizes')
+        parser.add_argument('--iterations', type=int, default=200)
+
+    def handle(self, *args, **options):
+        page_sizes = [int(size) for size in options['page_sizes'].split(',')]
+        host = next((h.lstrip('.') for h in settings.ALLOWED_HOSTS if h != '*'), 'localhost')
+        request = Request(APIRequestFactory(HTTP_HOST=host).get('/api/products/'))
+        context = {'request': request}
+        renderer = JSONRenderer()
+
+        # Seed rows are rolled back at the end.
+        with transaction.atomic():
+            self.seed(max(page_sizes))
+            cases = [
+                (ProductListSerializer, Product.objects.order_by('-created_at', '-id'), page_sizes),
+                (ProductDetailSerializer, Product.objects.order_by('-created_at', '-id'), [1]),
+                (CategoryListSerializer, Category.objects.order_by('id'), [20]),
+            ]
+            for serializer_class, queryset, sizes in cases:
+                for size in sizes:
+                    page = queryset[:size]
+
+                    def drf():
+                        return renderer.render(serializer_class(list(page), many=True, context=context).data)
+
+                    def compiled():
+                        return renderer.render(CompiledSerializer(serializer_class, page, many=True, context=context).data)
+
+                    if drf() != compiled():
+                        raise CommandError(f'{serializer_class.__name__}: compiled output differs from DRF')
+                    drf_time = self.timeit(drf, options['iterations'])
+                    compiled_time = self.timeit(compiled, options['iterations'])
+                    self.stdout.write(
+                        f'{serializer_class.__name__:<24} rows={size:<4} '
+                        f'drf={drf_time * 1000:8.3f}ms  compiled={compiled_time * 1000:8.3f}ms  '
+                        f'speedup={drf_time / compiled_time:5.2f}x'
+                    )
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('Compiled output is byte-identical to DRF.'))
+
+    def seed(self, rows):
+        categories = Category.objects.bulk_create([
+            Category(name=f'Benchmark {i}', slug=f'benchmark-{i}', description='', image=f'category_img/{i}.png')
+            for i in range(20)
+        ])
+        Product.objects.bulk_create([
+            Product(
+                name=f'Benchmark product {i}',
+                slug=f'benchmark-product-{i}',
+                description='Lorem ipsum dolor sit amet. ' * 10,
+                price=Decimal('19.99') + i,
+                sale_price=Decimal('17.49') + i,
+                discount=12,
+                rating=4.25,
+                reviews_count=i,
+                category=categories[i % len(categories)],
+                image=f'products/benchmark-{i}.webp',
+            )
+            for i in range(rows)
+        ])
+
+    def timeit(self, func, iterations):
+        """Mean seconds per call, including the DB read and JSON rendering."""
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        return (time.perf_counter() - start) / iterations
@@ -0,0 +1,103 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+from api.cart_store import cache_store_enabled
+from api.models import Cart, CartItem
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete carts (and their items) not updated for longer than the TTL, in bounded id-range '
+        'chunks with one short transaction each. Only anonymous carts unless --include-user-carts.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ttl-days', type=int, default=settings.CART_TTL_DAYS,
+                            help='Idle time after which a cart expires (default: CART_TTL_DAYS)')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Cart ids covered per transaction')
+        parser.add_argument('--pause', type=float, default=0, help='Seconds to sleep between chunks')
+        parser.add_argument('--include-user-carts', action='store_true', help='Also delete carts owned by users')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be deleted')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['ttl_days'])
+        expired = Cart.objects.filter(updated_at__lt=cutoff)
+        if not options['include_user_carts']:
+            expired = expired.filter(user__isnull=True)
+
+        bounds = expired.aggregate(low=Min('id'), high=Max('id'))
+        if bounds['low'] is None:
+            self.stdout.write(self.style.SUCCESS('No expired carts.'))
+            return
+
+        started = time.perf_counter()
+        freelist_before = self.sqlite_free_bytes()
+        carts = items = chunks = 0
+        estimated_bytes = 0 if connection.vendor == 'postgresql' else None
+        chunk_size = options['chunk_size']
+
+        for low in range(bounds['low'], bounds['high'] + 1, chunk_size):
+            with transaction.atomic():
+                chunk = expired.filter(id__gte=low, id__lt=low + chunk_size)
+                ids = self.skip_cached_carts(chunk.values_list('id', 'cart_code'))
+                if not ids:
+                    continue
+                if estimated_bytes is not None:
+                    estimated_bytes += self.postgres_row_bytes(ids)
+                if options['dry_run']:
+                    carts += len(ids)
+                    items += CartItem.objects.filter(cart_id__in=ids).count()
+                else:
+                    # Re-checks the TTL, so a cart touched since the SELECT survives
+                    _, deleted = chunk.filter(id__in=ids).delete()
+                    carts += deleted.get(Cart._meta.label, 0)
+                    items += deleted.get(CartItem._meta.label, 0)
+            chunks += 1
+            if options['pause']:
+                time.sleep(options['pause'])
+
+        if freelist_before is not None and not options['dry_run']:
+            estimated_bytes = self.sqlite_free_bytes() - freelist_before
+
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        size = f' (~{estimated_bytes / 1024:.1f} KiB)' if estimated_bytes is not None else ''
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {carts} carts and {items} cart items{size} in {chunks} chunks, {elapsed:.2f}s.'
+        ))
+
+    def skip_cached_carts(self, rows):
+        """Cart ids of `rows`, minus carts live in the cart cache store (their row lags behind)."""
+        rows = list(rows)
+        if not cache_store_enabled():
+            return [cart_id for cart_id, _ in rows]
+        cached = cache.get_many([f'cart:{cart_code}' for _, cart_code in rows])
+        return [cart_id for cart_id, cart_code in rows if f'cart:{cart_code}' not in cached]
+
+    def postgres_row_bytes(self, ids):
+        """On-disk size of the cart and cart item tuples about to be deleted."""
+        cart_table = connection.ops.quote_name(Cart._meta.db_table)
+        item_table = connection.ops.quote_name(CartItem._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT (SELECT COALESCE(SUM(pg_column_size(c.*)), 0) FROM {cart_table} c WHERE c.id = ANY(%s))'
+                f' + (SELECT COALESCE(SUM(pg_column_size(i.*)), 0) FROM {item_table} i WHERE i.cart_id = ANY(%s))',
+                [ids, ids],
+            )
+            return cursor.fetchone()[0]
+
+    def sqlite_free_bytes(self):
+        """Bytes on SQLite's freelist (pages freed by deletes), or None on other databases."""
+        if connection.vendor != 'sqlite':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA freelist_count')
+            free_pages = cursor.fetchone()[0]
+            cursor.execute('PRAGMA page_size')
+            return free_pages * cursor.fetchone()[0]
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from api.cache import cache_is_shared
+from api.cart_store import cache_store_enabled, flush_dirty_carts
+
+
+class Command(BaseCommand):
+    help = 'Write anonymous carts changed in the cache store back to the database (CART_STORE = "cache")'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='Carts written per transaction')
+        parser.add_argument('--interval', type=int, default=0, help='Keep running, flushing every N seconds')
+
+    def handle(self, *args, **options):
+        if not cache_store_enabled():
+            raise CommandError('The cart cache store is not enabled (set CART_STORE=cache)')
+
+        while True:
+            started = time.perf_counter()
+            written = flush_dirty_carts(chunk_size=options['chunk_size'])
+            if written is None:
+                self.stdout.write(self.style.WARNING('Another flush is already running.'))
+            elif not written and not cache_is_shared():
+                # A per-process cache only holds carts cached by this process, i.e. none
+                raise CommandError(
+                    'No tracked carts: the cache backend is per-process, so the carts cached '
+                    'by the web workers are not visible here. Use a shared CACHE_BACKEND.'
+                )
+            else:
+                elapsed = time.perf_counter() - started
+                self.stdout.write(self.style.SUCCESS(f'Flushed {written} carts in {elapsed:.2f}s.'))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
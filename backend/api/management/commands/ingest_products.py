@@ -0,0 +1,202 @@
+import csv
+import json
+import os
+import time
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils.text import slugify
+from api import feed, search
+from api.cache import bump_catalog_version
+from api.carts import refresh_cart_totals
+from api.identifiers import unique_values
+from api.models import Cart, Category, Product
+
+UPSERT_FIELDS = [
+    'name', 'description', 'price', 'discount', 'sale_price', 'stock', 'rating',
+    'category', 'featured', 'updated_at',
+]
+TRUE_VALUES = ('1', 'true', 'yes')
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream products from a JSONL or CSV file (DummyJSON field names) and upsert them on slug, '
+        'in chunked transactions with a checkpoint so an interrupted run resumes where it stopped'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='.jsonl or .csv file')
+        parser.add_argument('--format', choices=['jsonl', 'csv'], help='Default: from the file extension')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Records per transaction')
+        parser.add_argument('--checkpoint', help='Checkpoint file (default: <path>.checkpoint)')
+        parser.add_argument('--restart', action='store_true', help='Ignore an existing checkpoint')
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.is_file():
+            raise CommandError(f'No such file: {path}')
+        fmt = options['format'] or ('csv' if path.suffix.lower() == '.csv' else 'jsonl')
+        checkpoint_path = Path(options['checkpoint'] or f'{path}.checkpoint')
+        state = self.read_checkpoint(checkpoint_path, path, options['restart'])
+        if state['offset']:
+            self.stdout.write(f'Resuming at byte {state["offset"]} after {state["rows"]} rows.')
+
+        self.categories = {}
+        started = time.perf_counter()
+        rows_this_run = 0
+        with open(path, 'rb') as f:
+            records = self.csv_records(f, state['offset']) if fmt == 'csv' else self.jsonl_records(f, state['offset'])
+            chunk = []
+            for record, offset in records:
+                chunk.append(record)
+                if len(chunk) >= options['chunk_size']:
+                    rows_this_run += self.commit_chunk(chunk, offset, state, checkpoint_path)
+                    self.report_progress(state, rows_this_run, started)
+                    chunk = []
+            if chunk:
+                rows_this_run += self.commit_chunk(chunk, f.tell(), state, checkpoint_path)
+                self.report_progress(state, rows_this_run, started)
+
+        # Bulk upserts skip the Product signals, so redo their work once
+        search.rebuild_index()
+        bump_catalog_version()
+        feed.rebuild_feed()
+        checkpoint_path.unlink(missing_ok=True)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Upserted {state["rows"]} rows ({state["skipped"]} invalid records skipped) '
+            f'in {elapsed:.2f}s, {rows_this_run / elapsed if elapsed else 0:.0f} rows/sec.'
+        ))
+
+    def read_checkpoint(self, checkpoint_path, path, restart):
+        fresh = {'source': str(path.resolve()), 'offset': 0, 'rows': 0, 'skipped': 0}
+        if restart or not checkpoint_path.exists():
+            return fresh
+        with open(checkpoint_path) as f:
+            state = json.load(f)
+        if state['source'] != fresh['source'] or state['offset'] > path.stat().st_size:
+            raise CommandError(f'{checkpoint_path} belongs to another file; use --restart to ignore it')
+        return state
+
+    def write_checkpoint(self, checkpoint_path, state):
+        # Replaced atomically so a crash never leaves a torn checkpoint
+        tmp_path = checkpoint_path.with_name(checkpoint_path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, checkpoint_path)
+
+    def jsonl_records(self, f, offset):
+        """(record, byte offset just past it) for every non-blank line from `offset`."""
+        f.seek(offset)
+        for line in iter(f.readline, b''):
+            offset += len(line)
+            if line.strip():
+                try:
+                    yield json.loads(line), offset
+                except ValueError:
+                    yield None, offset
+
+    def csv_records(self, f, offset):
+        """(record, byte offset just past it) for every row from `offset`; the header is always read first."""
+        position = {'offset': 0}
+
+        def lines():
+            # csv.reader pulls exactly the lines of one row (quoted fields may
+            # span several), so the offset after each row is known
+            encoding = 'utf-8-sig'
+            for line in iter(f.readline, b''):
+                position['offset'] = f.tell()
+                yield line.decode(encoding)
+                encoding = 'utf-8'
+
+        line_iter = lines()
+        header = next(csv.reader(line_iter), None)
+        if header is None:
+            return
+        f.seek(max(offset, position['offset']))
+        for row in csv.DictReader(line_iter, fieldnames=header):
+            yield row, position['offset']
+
+    def commit_chunk(self, records, offset, state, checkpoint_path):
+        """Upsert one chunk and move the checkpoint past it; returns the number of upserted rows."""
+        products = {}
+        skipped = 0
+        for record in records:
+            product = self.to_product(record)
+            if product is None:
+                skipped += 1
+            else:
+                # A key repeated within one upsert would update the same row twice
+                products[product.slug] = product
+
+        with transaction.atomic():
+            self.resolve_categories(products.values())
+            Product.objects.bulk_create(
+                list(products.values()),
+                update_conflicts=True,
+                # MySQL upserts on any unique key and takes no conflict target
+                unique_fields=['slug'] if connection.features.supports_update_conflicts_with_target else None,
+                update_fields=UPSERT_FIELDS,
+            )
+            refresh_cart_totals(Cart.objects.filter(cartitems__product__slug__in=list(products)))
+
+        state['offset'] = offset
+        state['rows'] += len(products)
+        state['skipped'] += skipped
+        self.write_checkpoint(checkpoint_path, state)
+        return len(products)
+
+    def to_product(self, record):
+        """An unsaved Product for `record`, or None if it is invalid."""
+        try:
+            name = record['title'].strip()
+            if not name:
+                return None
+            slug = slugify(record.get('slug') or name)[:Product._meta.get_field('slug').max_length]
+            if not slug:
+                # e.g. a title without any ASCII letters or digits; /products/<slug>/ is ASCII only
+                return None
+            product = Product(
+                name=name[:Product._meta.get_field('name').max_length],
+                slug=slug,
+                description=record.get('description') or '',
+                price=Decimal(str(record['price'])),
+                discount=int(float(record.get('discountPercentage') or 0)),
+                stock=int(float(record.get('stock') or 0)),
+                rating=float(record.get('rating') or 0),
+                featured=str(record.get('featured', '')).lower() in TRUE_VALUES,
+            )
+        except (AttributeError, KeyError, TypeError, ValueError, InvalidOperation):
+            return None
+        product.apply_discount()
+        product._category_name = (record.get('category') or '').capitalize()
+        return product
+
+    def resolve_categories(self, products):
+        """Set each product's category, creating missing categories in one INSERT."""
+        names = {product._category_name for product in products if product._category_name}
+        missing = names.difference(self.categories)
+        if missing:
+            for category in Category.objects.filter(name__in=missing).order_by('-id'):
+                self.categories[category.name] = category
+            missing = sorted(missing.difference(self.categories))
+            slugs = unique_values(Category, 'slug', [slugify(name) for name in missing])
+            Category.objects.bulk_create([
+                Category(name=name, slug=slug, description=f'Premium products in {name}')
+                for name, slug in zip(missing, slugs)
+            ])
+            # Re-read by slug: not every backend (MySQL) returns the new primary keys
+            for category in Category.objects.filter(slug__in=slugs):
+                self.categories[category.name] = category
+        for product in products:
+            product.category = self.categories.get(product._category_name)
+
+    def report_progress(self, state, rows_this_run, started):
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{state["rows"]} rows, {rows_this_run / elapsed if elapsed else 0:.0f} rows/sec'
+        )
@@ -1,86 +1,193 @@
 import json
+import time
 import urllib.request
-from django.core.management.base import BaseCommand
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from decimal import Decimal
+from pathlib import Path
+
 from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
 from django.utils.text import slugify
-from api.models import Product, Category
-from decimal import Decimal
+from api import feed, search
+from api.cache import bump_catalog_version
+from api.carts import refresh_cart_totals
+from api.identifiers import unique_values
+from api.models import Cart, Category, Product
+
+DEFAULT_SOURCE = 'https://dummyjson.com/products?limit=30'
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'
+# bulk_update() skips auto_now, so updated_at (which the product and cart ETags
+# are derived from) is set explicitly
+UPDATED_FIELDS = [
+    'description', 'price', 'discount', 'sale_price', 'stock', 'rating', 'category', 'featured',
+    'updated_at', 'image',
+]
+
+
+def _download(url):
+    request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return response.read()
+
 
 class Command(BaseCommand):
-    help = 'Populate the database with fresh product data from DummyJSON API'
+    help = (
+        'Populate the database with product data from the DummyJSON API, or from a local '
+        'JSON file / directory of JSON files in the same format'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', default=DEFAULT_SOURCE,
+                            help='URL, JSON file or directory of JSON files (default: DummyJSON, 30 products)')
+        parser.add_argument('--workers', type=int, default=8, help='Threads fetching and uploading images')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows per bulk INSERT / UPDATE')
+        parser.add_argument('--skip-images', action='store_true', help='Leave product images untouched')
 
     def handle(self, *args, **options):
-        url = "https://dummyjson.com/products?limit=30"
-        self.stdout.write(f"Fetching fresh data from {url}...")
-        
-        req = urllib.request.Request(
-            url, 
-            data=None, 
-            headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'
-            }
-        )
+        self.timings = []
 
-        try:
-            with urllib.request.urlopen(req) as response:
-                data = json.loads(response.read().decode())
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(f"Failed to fetch data: {e}"))
-            return
-
-        for item in data['products']:
-            # Handle Category
-            category_name = item['category'].capitalize()
-            category, created = Category.objects.get_or_create(
-                name=category_name,
-                defaults={'description': f'Premium products in {category_name}'}
-            )
-            if created:
-                self.stdout.write(self.style.SUCCESS(f'Created category: {category_name}'))
-
-            # Handle Product
-            product_name = item['title']
-            
-            # Use get_or_create to update instead of duplicate
-            product, created = Product.objects.get_or_create(
-                name=product_name,
-                defaults={'category': category, 'price': Decimal('0'), 'description': ''}
-            )
-            
+        with self.stage('fetch'):
+            items = self.load(options['source'])
+        with self.stage('categories'):
+            categories = self.resolve_categories(items)
+        with self.stage('products'):
+            created, updated = self.build_products(items, categories)
+        if not options['skip_images']:
+            with self.stage('images'):
+                self.fetch_images(created + updated, options['workers'])
+        with self.stage('write'):
+            with transaction.atomic():
+                Product.objects.bulk_create([product for product, _ in created], batch_size=options['batch_size'])
+                Product.objects.bulk_update(
+                    [product for product, _ in updated],
+                    UPDATED_FIELDS if not options['skip_images'] else UPDATED_FIELDS[:-1],
+                    batch_size=options['batch_size'],
+                )
+        with self.stage('refresh'):
+            # Bulk writes skip the Product signals, so redo their work once
+            search.rebuild_index()
+            refresh_cart_totals(Cart.objects.filter(cartitems__product__in=[product for product, _ in updated]))
+            bump_catalog_version()
+            feed.rebuild_feed()
+
+        timings = ', '.join(f'{name} {seconds:.2f}s' for name, seconds in self.timings)
+        self.stdout.write(self.style.SUCCESS(
+            f'Database population complete: {len(created)} products created, {len(updated)} updated ({timings}).'
+        ))
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        yield
+        self.timings.append((name, time.perf_counter() - started))
+
+    def load(self, source):
+        """[(item, directory local image paths are relative to)]"""
+        if source.startswith(('http://', 'https://')):
+            self.stdout.write(f'Fetching fresh data from {source}...')
+            try:
+                return [(item, None) for item in self.products_in(json.loads(_download(source).decode()))]
+            except Exception as e:
+                raise CommandError(f'Failed to fetch data: {e}')
+
+        path = Path(source)
+        if path.is_dir():
+            files = sorted(path.glob('*.json'))
+        elif path.is_file():
+            files = [path]
+        else:
+            raise CommandError(f'No such file or directory: {source}')
+        items = []
+        for file in files:
+            with open(file) as f:
+                items += [(item, file.parent) for item in self.products_in(json.load(f))]
+        return items
+
+    def products_in(self, data):
+        # DummyJSON wraps the list in {"products": [...]}
+        return data['products'] if isinstance(data, dict) else data
+
+    def resolve_categories(self, items):
+        """{name: Category} for every category in `items`, creating missing ones in one INSERT."""
+        names = sorted({item['category'].capitalize() for item, _ in items})
+        categories = {}
+        for category in Category.objects.filter(name__in=names).order_by('-id'):
+            categories[category.name] = category
+        missing = [name for name in names if name not in categories]
+        slugs = unique_values(Category, 'slug', [slugify(name) for name in missing])
+        Category.objects.bulk_create([
+            Category(name=name, slug=slug, description=f'Premium products in {name}')
+            for name, slug in zip(missing, slugs)
+        ])
+        # Re-read by slug: not every backend (MySQL) returns the new primary keys
+        for category in Category.objects.filter(slug__in=slugs):
+            categories[category.name] = category
+            self.stdout.write(self.style.SUCCESS(f'Created category: {category.name}'))
+        return categories
+
+    def build_products(self, items, categories):
+        """Unsaved new products and modified existing ones, each paired with its source item."""
+        existing = {}
+        names = [item['title'] for item, _ in items]
+        for product in Product.objects.filter(name__in=names).order_by('-id'):
+            existing[product.name] = product
+
+        now = timezone.now()
+        created, updated, seen = [], [], set()
+        for item, base_dir in items:
+            name = item['title']
+            product = existing.get(name)
+            if product is None:
+                product = existing[name] = Product(name=name)
+                created.append((product, (item, base_dir)))
+            elif name not in seen:
+                updated.append((product, (item, base_dir)))
+            seen.add(name)
             product.description = item['description']
             product.price = Decimal(str(item['price']))
             product.discount = int(item['discountPercentage'])
             product.stock = item['stock']
             product.rating = item['rating']
-            product.category = category
+            product.category = categories[item['category'].capitalize()]
             product.featured = (item['id'] % 5 == 0)
+            product.apply_discount()
+            product.updated_at = now
 
-            # Download Image
-            image_url = item['thumbnail']
+        new_products = [product for product, _ in created]
+        for product, slug in zip(new_products, unique_values(Product, 'slug', [slugify(p.name) for p in new_products])):
+            product.slug = slug
+        return created, updated
+
+    def fetch_images(self, products, workers):
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for message in executor.map(lambda entry: self.fetch_image(*entry), products):
+                if message:
+                    self.stdout.write(self.style.WARNING(message))
+
+    def fetch_image(self, product, source):
+        """Download and upload one product image; returns a warning or None. Runs in a worker thread."""
+        item, base_dir = source
+        name = slugify(product.name)
+        thumbnail = item.get('thumbnail')
+        try:
+            if not thumbnail:
+                raise ValueError('no thumbnail')
+            if base_dir is None or thumbnail.startswith(('http://', 'https://')):
+                content = _download(thumbnail)
+            else:
+                content = (base_dir / thumbnail).read_bytes()
+            product.image.save(f'{name}.webp', ContentFile(content), save=False)
+            return None
+        except Exception as e:
+            if base_dir is not None:
+                return f'Failed to load image for {product.name}: {e}'
+            # Fallback to a placeholder if image fails
             try:
-                img_name = f"{slugify(product_name)}.webp"
-                self.stdout.write(f"Downloading image for {product_name}...")
-                
-                img_req = urllib.request.Request(
-                    image_url, 
-                    headers={'User-Agent': 'Mozilla/5.0'}
-                )
-                
-                with urllib.request.urlopen(img_req) as img_response:
-                    product.image.save(img_name, ContentFile(img_response.read()), save=False)
-                self.stdout.write(self.style.SUCCESS(f'Uploaded image to Cloudinary for: {product_name}'))
-            except Exception as e:
-                self.stdout.write(self.style.WARNING(f'Failed to download image for {product_name}: {e}'))
-                # Fallback to a placeholder if image fails
-                placeholder_url = f"https://dummyjson.com/image/400?text={slugify(product_name)}"
-                try:
-                    p_req = urllib.request.Request(placeholder_url, headers={'User-Agent': 'Mozilla/5.0'})
-                    with urllib.request.urlopen(p_req) as img_response:
-                         product.image.save(f"{slugify(product_name)}-placeholder.png", ContentFile(img_response.read()), save=False)
-                except:
-                    pass
-
-            product.save()
-            self.stdout.write(self.style.SUCCESS(f'Successfully processed product: {product_name}'))
-
-        self.stdout.write(self.style.SUCCESS('Database population complete!'))
+                content = _download(f'https://dummyjson.com/image/400?text={name}')
+                product.image.save(f'{name}-placeholder.png', ContentFile(content), save=False)
+            except Exception:
+                pass
+            return f'Failed to download image for {product.name}: {e}'
@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max, Min
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete expired outstanding refresh tokens and their blacklist entries, in bounded '
+        'id-range chunks with one short transaction each. A chunked flushexpiredtokens.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Token ids covered per transaction')
+        parser.add_argument('--pause', type=float, default=0, help='Seconds to sleep between chunks')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be deleted')
+
+    def handle(self, *args, **options):
+        expired = OutstandingToken.objects.filter(expires_at__lte=aware_utcnow())
+        bounds = expired.aggregate(low=Min('id'), high=Max('id'))
+        if bounds['low'] is None:
+            self.stdout.write(self.style.SUCCESS('No expired tokens.'))
+            return
+
+        started = time.perf_counter()
+        outstanding = blacklisted = chunks = 0
+        chunk_size = options['chunk_size']
+
+        for low in range(bounds['low'], bounds['high'] + 1, chunk_size):
+            chunk = expired.filter(id__gte=low, id__lt=low + chunk_size)
+            with transaction.atomic():
+                if options['dry_run']:
+                    outstanding += chunk.count()
+                    blacklisted += BlacklistedToken.objects.filter(token__in=chunk).count()
+                else:
+                    _, deleted = chunk.delete()
+                    outstanding += deleted.get(OutstandingToken._meta.label, 0)
+                    blacklisted += deleted.get(BlacklistedToken._meta.label, 0)
+            chunks += 1
+            if options['pause']:
+                time.sleep(options['pause'])
+
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {outstanding} outstanding and {blacklisted} blacklisted tokens '
+            f'in {chunks} chunks, {elapsed:.2f}s.'
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from api.feed import rebuild_feed
+from api.models import FeedSection
+
+
+class Command(BaseCommand):
+    help = 'Rebuild every materialized section of the homepage feed (after bulk product writes)'
+
+    def handle(self, *args, **options):
+        rebuild_feed()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {FeedSection.objects.count()} homepage feed sections.'))
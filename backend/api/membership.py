@@ -0,0 +1,52 @@
+"""
+Per-user product-id sets for "in wishlist" / "in cart" markers.
+
+The sets are cached per user under a per-user version, bumped by
+`invalidate_membership` whenever that user's wishlist or cart items change
+(wishlist views, carts.touch_cart). A read racing with a write can only ever
+store its result under the old version, so it is never served again.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import CartItem, WishlistItem
+
+
+def _version_key(user_id):
+    return f'membership:version:{user_id}'
+
+
+def _membership_version(user_id):
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        # Seeded from the clock like the catalog version, so an evicted version never repeats
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_membership(user_id):
+    try:
+        cache.incr(_version_key(user_id))
+    except ValueError:
+        _membership_version(user_id)
+
+
+def product_membership(user):
+    """{'wishlist': [product ids], 'cart': [product ids]} for `user`, sorted."""
+    key = f'membership:{user.pk}:{_membership_version(user.pk)}'
+    membership = cache.get(key)
+    if membership is None:
+        membership = {
+            'wishlist': sorted(
+                WishlistItem.objects.filter(wishlist__user=user).values_list('product_id', flat=True)
+            ),
+            'cart': sorted(set(
+                CartItem.objects.filter(cart__user=user).values_list('product_id', flat=True)
+            )),
+        }
+        cache.set(key, membership, settings.MEMBERSHIP_CACHE_TIMEOUT)
+    return membership
@@ -0,0 +1,62 @@
+# Generated by Django 6.0.2 on 2026-10-17 09:00
+
+from django.db import DatabaseError, migrations, transaction
+
+
+POSTGRES_SEARCH_VECTOR = """
+    ALTER TABLE products ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED;
+    CREATE INDEX products_search_vector_idx ON products USING gin (search_vector);
+"""
+
+POSTGRES_TRIGRAM = """
+    CREATE EXTENSION IF NOT EXISTS pg_trgm;
+    CREATE INDEX products_name_trgm_idx ON products USING gin (name gin_trgm_ops);
+"""
+
+SQLITE_FTS = [
+    "CREATE VIRTUAL TABLE products_fts USING fts5(name, description, tokenize = 'porter unicode61')",
+    "INSERT INTO products_fts (rowid, name, description) SELECT id, name, description FROM products",
+]
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_SEARCH_VECTOR)
+        # pg_trgm needs extension privileges; search works without it.
+        try:
+            with transaction.atomic(using=connection.alias):
+                schema_editor.execute(POSTGRES_TRIGRAM)
+        except DatabaseError:
+            pass
+    elif connection.vendor == 'sqlite':
+        try:
+            with transaction.atomic(using=connection.alias):
+                for statement in SQLITE_FTS:
+                    schema_editor.execute(statement)
+        except DatabaseError:
+            # SQLite built without FTS5: ?search= falls back to icontains.
+            pass
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS products_name_trgm_idx')
+        schema_editor.execute('ALTER TABLE products DROP COLUMN IF EXISTS search_vector')
+    elif connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS products_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_product_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
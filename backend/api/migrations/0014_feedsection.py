@@ -0,0 +1,24 @@
+# Generated by Django 6.0.2 on 2026-10-17 11:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_product_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedSection',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=50, unique=True)),
+                ('sort_key', models.CharField(blank=True, max_length=100)),
+                ('payload', models.TextField()),
+                ('product_ids', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 6.0.2 on 2026-10-17 13:20
+
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_totals(apps, schema_editor):
+    Cart = apps.get_model('api', 'Cart')
+    CartItem = apps.get_model('api', 'CartItem')
+
+    def aggregate(expression, output_field):
+        items = CartItem.objects.filter(cart=OuterRef('pk')).order_by().values('cart')
+        return Coalesce(Subquery(items.annotate(value=expression).values('value')), Value(0), output_field=output_field)
+
+    Cart.objects.update(
+        item_count=aggregate(Count('id'), IntegerField()),
+        total_quantity=aggregate(Sum('quantity'), IntegerField()),
+        total_amount=aggregate(
+            Sum(F('quantity') * F('product__sale_price')),
+            DecimalField(max_digits=12, decimal_places=2),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_cartitem_unique_cart_product'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='cart',
+            name='total_amount',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='cart',
+            name='total_quantity',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_totals, migrations.RunPython.noop),
+    ]
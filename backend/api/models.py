@@ -1,8 +1,12 @@
 from decimal import Decimal
+from functools import partial
 from django.db import models
 from django.utils.text import slugify
 from django.contrib.auth.models import AbstractUser
 
+from .identifiers import save_with_unique_value
+from .user_cache import cache_user
+
 # Create your models here.
 class CustomUser(AbstractUser):
     ROLE_CHOICES = [
@@ -32,6 +36,15 @@ class CustomUser(AbstractUser):
 
     def __str__(self):
         return self.email
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        deferred = self.get_deferred_fields()
+        if fields is None or not deferred.issuperset(fields):
+            return super().refresh_from_db(using=using, fields=fields, **kwargs)
+        # A user built from token claims defers the rest of its row: load all of
+        # it on first access rather than one query per attribute, and cache it.
+        super().refresh_from_db(using=using, fields=deferred, **kwargs)
+        cache_user(self)
     
 class Category(models.Model):
     name = models.CharField(max_length=100)
@@ -44,15 +57,10 @@ class Category(models.Model):
         return self.name
     
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.name)
-            unique_slug = self.slug
-            counter = 1
-            while Category.objects.filter(slug=unique_slug).exists():
-                unique_slug = f'{self.slug}-{counter}'
-                counter += 1
-            self.slug = unique_slug
-        super().save(*args, **kwargs)
+        if self.slug:
+            super().save(*args, **kwargs)
+        else:
+            save_with_unique_value(self, 'slug', slugify(self.name), partial(super().save, *args, **kwargs))
     
 class Product(models.Model):
     name = models.CharField(max_length=100)
@@ -75,33 +83,70 @@ class Product(models.Model):
         indexes = [
             models.Index(fields=['category']),
             models.Index(fields=['slug']),
+            # Keyset pagination: (sort key, id) for each supported ordering
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['price', 'id']),
+            # ProductFilter combinations, verified by api.tests.ProductQueryPlanTests
+            models.Index(fields=['category', 'created_at', 'id']),
+            models.Index(fields=['category', 'price', 'id']),
+            models.Index(fields=['sale_price', 'id']),
+            models.Index(fields=['created_at', 'id'], condition=models.Q(featured=True), name='products_featured_created_idx'),
+            models.Index(fields=['price', 'id'], condition=models.Q(featured=True), name='products_featured_price_idx'),
         ]
 
     def __str__(self):
         return self.name
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Snapshot of the loaded row so post_save handlers can tell what changed
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def field_changed(self, name):
+        """True if `name` differs from the loaded row (or the row was not loaded)."""
+        loaded = getattr(self, '_loaded_values', {})
+        attname = self._meta.get_field(name).attname
+        return attname not in loaded or loaded[attname] != getattr(self, attname)
     
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.name)
-            unique_slug = self.slug
-            counter = 1
-            while Product.objects.filter(slug=unique_slug).exists():
-                unique_slug = f'{self.slug}-{counter}'
-                counter += 1
-            self.slug = unique_slug
-        
-        # Sale price logic
+    def apply_discount(self):
+        """Set sale_price from price and discount (bulk writes skip save())."""
         if self.discount > 0:
             discount_amount = (self.price * Decimal(self.discount)) / Decimal(100)
             self.sale_price = self.price - discount_amount
         else:
             self.sale_price = self.price
 
-        super().save(*args, **kwargs)
+    def save(self, *args, **kwargs):
+        self.apply_discount()
+        if self.slug:
+            super().save(*args, **kwargs)
+        else:
+            save_with_unique_value(self, 'slug', slugify(self.name), partial(super().save, *args, **kwargs))
+        self._loaded_values = {f.attname: getattr(self, f.attname) for f in self._meta.concrete_fields}
+
+class FeedSection(models.Model):
+    """
+    One materialized section of the homepage feed, stored as ready-to-send JSON.
+    Keys: 'featured', 'top_rated' and 'category:<id>' (newest per category).
+    """
+    key = models.CharField(max_length=50, unique=True)
+    sort_key = models.CharField(max_length=100, blank=True)
+    payload = models.TextField()
+    product_ids = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.key
 
 class Cart(models.Model):
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="carts", null=True, blank=True)
     cart_code = models.CharField(max_length=11, unique=True)
+    # Denormalized from cartitems; kept current by carts.touch_cart on every item change
+    item_count = models.PositiveIntegerField(default=0)
+    total_quantity = models.PositiveIntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -113,6 +158,12 @@ class CartItem(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='item')
     quantity = models.IntegerField(default=1)
 
+    class Meta:
+        constraints = [
+            # Lets add_to_cart upsert with ON CONFLICT (cart_id, product_id)
+            models.UniqueConstraint(fields=['cart', 'product'], name='unique_cart_product'),
+        ]
+
     def __str__(self):
         return f"{self.quantity} x {self.product.name} in cart {self.cart.cart_code}"
 
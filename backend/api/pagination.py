@@ -0,0 +1,176 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework import exceptions
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .models import Product
+
+
+class ProductPageNumberPagination(PageNumberPagination):
+    """
+    Classic ?page=N pagination. Runs a COUNT(*) and an OFFSET scan per page,
+    kept for clients that need page numbers or a total count.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class ProductCursorPagination(BasePagination):
+    """
+    Keyset pagination for products.
+
+    Each supported ordering is paired with an `id` tiebreaker so the sort key is
+    unique, and every page is fetched with a `WHERE (key, id) > (last_key, last_id)`
+    style predicate backed by the matching (key, id) index. No COUNT(*) and no
+    OFFSET are ever issued, so page 1000 costs the same as page 1.
+
+    Cursors are opaque base64 tokens returned in `next` / `previous`.
+
+    Search results are ordered by relevance, which is not a keyset ordering, so
+    ?search= is rejected with a 400; search with ?page= instead.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 20
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+    search_not_supported_message = 'Cursor pagination does not support search; use ?page= instead.'
+
+    # ordering requested via ?ordering= -> (sort field, descending)
+    orderings = {
+        '-created_at': ('created_at', True),
+        'created_at': ('created_at', False),
+        'price': ('price', False),
+        '-price': ('price', True),
+    }
+    default_ordering = '-created_at'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get(api_settings.SEARCH_PARAM, '').strip():
+            raise exceptions.ValidationError({api_settings.SEARCH_PARAM: self.search_not_supported_message})
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+        field, descending = self.orderings[self.ordering]
+
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor['r'])
+
+        # Walking backwards flips the scan direction; results are re-reversed below.
+        scan_descending = descending != reverse
+        prefix = '-' if scan_descending else ''
+        queryset = queryset.order_by(f'{prefix}{field}', f'{prefix}id')
+
+        if cursor is not None:
+            op = 'lt' if scan_descending else 'gt'
+            # The leading `key >= v` (or <=) bound lets the planner seek into the
+            # (key, id) index; the OR alone would walk it from the start.
+            queryset = queryset.filter(
+                Q(**{f'{field}__{op}e': cursor['v']}),
+                Q(**{f'{field}__{op}': cursor['v']}) | Q(**{field: cursor['v'], f'id__{op}': cursor['id']}),
+            )
+
+        # Fetch one extra row to learn whether another page exists.
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next = cursor is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Resolve the validated ?ordering= value the same way OrderingFilter does,
+        falling back to the default when it is not a keyset-capable ordering.
+        """
+        ordering = OrderingFilter().get_ordering(request, queryset, view) or []
+        if ordering and ordering[0] in self.orderings:
+            return ordering[0]
+        return self.default_ordering
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        field, _ = self.orderings[self.ordering]
+        try:
+            raw = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            if raw['o'] != self.ordering:
+                raise ValueError('cursor ordering mismatch')
+            return {
+                'v': Product._meta.get_field(field).to_python(raw['v']),
+                'id': int(raw['id']),
+                'r': bool(raw.get('r')),
+            }
+        except (TypeError, ValueError, KeyError, UnicodeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, obj, reverse):
+        field, _ = self.orderings[self.ordering]
+        # Rows are model instances, or dicts when read with .values()
+        value, pk = (obj[field], obj['id']) if isinstance(obj, dict) else (getattr(obj, field), obj.pk)
+        payload = {
+            'o': self.ordering,
+            'v': value.isoformat() if hasattr(value, 'isoformat') else str(value),
+            'id': pk,
+            'r': reverse,
+        }
+        encoded = base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded.decode('ascii'))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
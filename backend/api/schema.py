@@ -0,0 +1,7 @@
+"""drf-spectacular extensions for the API's own classes."""
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class ClaimsJWTScheme(SimpleJWTScheme):
+    # Same bearer scheme (jwtAuth) as the JWTAuthentication it subclasses
+    target_class = 'api.authentication.ClaimsJWTAuthentication'
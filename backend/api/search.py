@@ -0,0 +1,146 @@
+"""
+Full-text product search.
+
+PostgreSQL: `products.search_vector` is a stored generated tsvector column
+(name weighted A, description weighted B) with a GIN index, so Postgres keeps
+it current on every INSERT/UPDATE. With PRODUCT_SEARCH_TRIGRAM enabled, names
+are also matched by pg_trgm similarity to tolerate typos.
+
+SQLite: an FTS5 table `products_fts` keyed by product id, kept in sync from
+the Product post_save/post_delete signals and ranked with bm25().
+
+Any other database falls back to DRF's icontains SearchFilter.
+"""
+import re
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import SearchFilter
+
+from .models import Product
+
+FTS_TABLE = 'products_fts'
+MAX_TOKENS = 8
+TOKEN_RE = re.compile(r'\w+')
+
+_fts_available = False
+
+
+def search_tokens(term):
+    return TOKEN_RE.findall(term.lower())[:MAX_TOKENS]
+
+
+def trigram_enabled():
+    return getattr(settings, 'PRODUCT_SEARCH_TRIGRAM', False)
+
+
+def search_backend():
+    """Return 'postgresql', 'sqlite' or None when full-text search is unavailable."""
+    global _fts_available
+    if connection.vendor == 'postgresql':
+        return 'postgresql'
+    if connection.vendor == 'sqlite':
+        # Only a positive answer is remembered: the table appears once migrations run
+        if not _fts_available:
+            _fts_available = FTS_TABLE in connection.introspection.table_names()
+        return 'sqlite' if _fts_available else None
+    return None
+
+
+def search_products(queryset, term):
+    """
+    Restrict `queryset` to products matching `term` and annotate `search_rank`
+    (higher is more relevant). Returns the queryset unchanged for empty terms.
+    Raises ImproperlyConfigured when search_backend() is None.
+    """
+    tokens = search_tokens(term)
+    if not tokens:
+        return queryset
+
+    table = connection.ops.quote_name(Product._meta.db_table)
+    backend = search_backend()
+
+    if backend == 'postgresql':
+        tsquery = ' & '.join(f'{token}:*' for token in tokens)
+        match = f"{table}.search_vector @@ to_tsquery('english', %s)"
+        rank = f"ts_rank_cd({table}.search_vector, to_tsquery('english', %s))"
+        match_params, rank_params = [tsquery], [tsquery]
+        if trigram_enabled():
+            phrase = ' '.join(tokens)
+            match = f'({match} OR {table}.name %% %s)'
+            rank = f'({rank} + similarity({table}.name, %s))'
+            match_params.append(phrase)
+            rank_params.append(phrase)
+        return queryset.filter(
+            RawSQL(match, match_params, output_field=BooleanField())
+        ).annotate(search_rank=RawSQL(rank, rank_params, output_field=FloatField()))
+
+    if backend == 'sqlite':
+        fts_query = ' '.join(f'"{token}"*' for token in tokens)
+        # bm25() weights name 10x over description; lower scores are better.
+        rank = (
+            f'-(SELECT bm25({FTS_TABLE}, 10.0, 1.0) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = {table}.id)'
+        )
+        return queryset.filter(
+            id__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [fts_query])
+        ).annotate(search_rank=RawSQL(rank, [fts_query], output_field=FloatField()))
+
+    raise ImproperlyConfigured(
+        f'Full-text search needs PostgreSQL or the SQLite {FTS_TABLE} table (run migrate); '
+        f'the database backend is {connection.vendor}'
+    )
+
+
+def index_product(product):
+    """Refresh the search index row for one product (no-op outside SQLite)."""
+    if search_backend() != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT OR REPLACE INTO {FTS_TABLE} (rowid, name, description) VALUES (%s, %s, %s)',
+            [product.pk, product.name, product.description],
+        )
+
+
+def unindex_product(product_id):
+    if search_backend() != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [product_id])
+
+
+def rebuild_index():
+    """Rebuild the SQLite FTS table from scratch, e.g. after bulk writes."""
+    if search_backend() != 'sqlite':
+        return
+    table = connection.ops.quote_name(Product._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, description) '
+            f'SELECT id, name, description FROM {table}'
+        )
+
+
+class ProductSearchFilter(SearchFilter):
+    """
+    Drop-in replacement for SearchFilter on ?search=. Uses the full-text index
+    and orders by relevance unless the client asked for an explicit ?ordering=.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if search_backend() is None:
+            return super().filter_queryset(request, queryset, view)
+
+        term = ' '.join(self.get_search_terms(request))
+        if not search_tokens(term):
+            return queryset
+
+        queryset = search_products(queryset, term)
+        if 'ordering' not in request.query_params:
+            queryset = queryset.order_by('-search_rank', '-id')
+        return queryset
@@ -1,9 +1,11 @@
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
 from drf_spectacular.utils import extend_schema_field
 from drf_spectacular.types import OpenApiTypes
 from django.contrib.auth import get_user_model
 from .models import Cart, CartItem, Product, Category, Wishlist, WishlistItem
+from .identifiers import with_unique_value
+from .tokens import CachedBlacklistRefreshToken
 
 User = get_user_model()
 
@@ -33,24 +35,24 @@ class SignUpSerializer(serializers.ModelSerializer):
         password = validated_data.pop('password')
         email = validated_data.get('email')
         
-        # Generate username from email (use email prefix before @)
-        username = email.split('@')[0]
-        
-        # Ensure username is unique
-        counter = 1
-        original_username = username
-        while User.objects.filter(username=username).exists():
-            username = f"{original_username}{counter}"
-            counter += 1
-        
-        user = User.objects.create_user(
-            username=username,
-            password=password,
-            **validated_data
+        # Generate a unique username from the email prefix (john, john1, john2, ...)
+        return with_unique_value(
+            User, 'username', email.split('@')[0],
+            lambda username: User.objects.create_user(username=username, password=password, **validated_data),
+            separator='',
         )
-        return user
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = CachedBlacklistRefreshToken
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        # Read back by ClaimsJWTAuthentication instead of loading the user
+        token['email'] = user.email
+        token['role'] = user.role
+        return token
+
     def validate(self, attrs):
         data = super().validate(attrs)
         user = self.user
@@ -64,31 +66,86 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         }
         return data
 
+class CachedTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = CachedBlacklistRefreshToken
+
+# ==================== SPARSE FIELDSETS ====================
+
+def _split_param(value):
+    return {name.strip() for name in (value or '').split(',') if name.strip()}
+
+
+class SparseFieldsetMixin:
+    """
+    Lets clients trim a read-only payload with ?fields=a,b or ?omit=c; unknown
+    names are rejected with a 400 that lists them. Views call
+    `selected_columns()` to push the same selection into `.only()` so unused
+    columns are never read from the database.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None:
+            return
+        selected = set(self.selected_fields(request))
+        for name in list(self.fields):
+            if name not in selected:
+                self.fields.pop(name)
+
+    @classmethod
+    def selected_fields(cls, request):
+        params = request.query_params
+        fields = list(cls.Meta.fields)
+        requested = _split_param(params.get('fields'))
+        omitted = _split_param(params.get('omit'))
+        errors = {}
+        for param, names in (('fields', requested), ('omit', omitted)):
+            unknown = sorted(names.difference(fields))
+            if unknown:
+                errors[param] = f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(fields)}"
+        if errors:
+            raise serializers.ValidationError(errors)
+        if requested:
+            fields = [name for name in fields if name in requested]
+        return [name for name in fields if name not in omitted]
+
+    @classmethod
+    def selected_columns(cls, request):
+        concrete = {field.name for field in cls.Meta.model._meta.concrete_fields}
+        return [name for name in cls.selected_fields(request) if name in concrete]
+
 # ==================== PRODUCT SERIALIZERS ====================
 
-class ProductListSerializer(serializers.ModelSerializer):
+class ProductListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = ["id", "name", "slug", "description", "image", "sale_price", "price", "discount", "rating", "reviews_count"]
 
-class ProductDetailSerializer(serializers.ModelSerializer):
+class ProductDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = ['id', 'name', 'image', 'description', 'price', 'discount', 'sale_price', 'slug', 'stock', 'rating', 'reviews_count', 'featured', 'category']
 
 # ==================== CATEGORY SERIALIZERS ====================
 
-class CategoryListSerializer(serializers.ModelSerializer):
+class CategoryListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ["id", "name", "image", 'slug']
 
 class CategoryDetailSerializer(serializers.ModelSerializer):
-    products = ProductListSerializer(many=True, read_only=True)
+    products = serializers.SerializerMethodField()
+
     class Meta:
         model = Category
         fields = ["id", "name", "image", "products", "slug"]
 
+    @extend_schema_field(OpenApiTypes.OBJECT)
+    def get_products(self, category):
+        # Paginated page of ProductListSerializer data, built by the view
+        return self.context.get('products')
+
 # ==================== CART SERIALIZERS ====================
 
 class CartItemSerializer(serializers.ModelSerializer):
@@ -113,17 +170,34 @@ class CartSerializer(serializers.ModelSerializer):
 
     @extend_schema_field(OpenApiTypes.FLOAT)
     def get_cart_total(self, cart):
+        # Items and products come prefetched (carts.load_cart_items), so this is in-memory
         return sum(item.quantity * item.product.sale_price for item in cart.cartitems.all())
 
+class CartOperationSerializer(serializers.Serializer):
+    op = serializers.ChoiceField(choices=['add', 'set', 'remove'])
+    product_id = serializers.IntegerField()
+    quantity = serializers.IntegerField(required=False)
+
+    def validate(self, data):
+        if data['op'] == 'add':
+            data.setdefault('quantity', 1)
+            if data['quantity'] <= 0:
+                raise serializers.ValidationError({"quantity": "Quantity must be greater than zero"})
+        elif data['op'] == 'set' and 'quantity' not in data:
+            raise serializers.ValidationError({"quantity": "This field is required for set."})
+        return data
+
+class CartBatchSerializer(serializers.Serializer):
+    cart_code = serializers.CharField()
+    operations = CartOperationSerializer(many=True, allow_empty=False, max_length=100)
+
 class CartStatSerializer(serializers.ModelSerializer):
-    total_quantity = serializers.SerializerMethodField()
+    # Float like CartSerializer.cart_total
+    total_amount = serializers.FloatField(read_only=True)
 
     class Meta:
         model = Cart
-        fields = ['id', 'cart_code', 'total_quantity']
-
-    def get_total_quantity(self, cart):
-        return sum(item.quantity for item in cart.cartitems.all())
+        fields = ['id', 'cart_code', 'item_count', 'total_quantity', 'total_amount']
 
 # ==================== WISHLIST SERIALIZERS ====================
 
@@ -141,3 +215,11 @@ class WishlistSerializer(serializers.ModelSerializer):
     class Meta:
         model = Wishlist
         fields = ['id', 'user', 'items', 'created_at']
+
+class WishlistBulkSerializer(serializers.Serializer):
+    product_ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=100)
+
+class WishlistMoveSerializer(serializers.Serializer):
+    cart_code = serializers.CharField()
+    # Omit to move the whole wishlist
+    product_ids = serializers.ListField(child=serializers.IntegerField(), required=False, max_length=100)
@@ -0,0 +1,92 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from . import feed, search
+from .cache import bump_catalog_version
+from .carts import refresh_cart_totals
+from .models import Cart, CartItem, Category, CustomUser, Product
+from .tokens import remember_blacklisted, remember_not_blacklisted
+from .user_cache import cache_user, forget_user
+
+
+@receiver(post_save, sender=Product)
+def index_saved_product(sender, instance, **kwargs):
+    search.index_product(instance)
+
+
+@receiver(post_delete, sender=Product)
+def unindex_deleted_product(sender, instance, **kwargs):
+    search.unindex_product(instance.pk)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_catalog_cache(sender, **kwargs):
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=Product)
+def refresh_feed_for_product(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        feed.product_saved(instance, created)
+
+
+@receiver(post_delete, sender=Product)
+def refresh_feed_for_deleted_product(sender, instance, **kwargs):
+    feed.product_deleted(instance)
+
+
+@receiver(post_save, sender=Category)
+def refresh_feed_for_category(sender, instance, raw=False, **kwargs):
+    if not raw:
+        feed.category_saved(instance)
+
+
+@receiver(post_delete, sender=Category)
+def drop_feed_for_category(sender, instance, **kwargs):
+    feed.category_deleted(instance)
+
+
+@receiver(post_save, sender=Product)
+def reprice_carts_for_product(sender, instance, created, raw=False, **kwargs):
+    if not raw and not created and instance.field_changed('sale_price'):
+        refresh_cart_totals(Cart.objects.filter(cartitems__product=instance))
+
+
+@receiver(pre_delete, sender=Product)
+def remember_carts_for_deleted_product(sender, instance, **kwargs):
+    # Its cart items are cascade-deleted before post_delete, so collect the carts now
+    instance._cart_ids = list(CartItem.objects.filter(product=instance).values_list('cart_id', flat=True))
+
+
+@receiver(post_delete, sender=Product)
+def reprice_carts_for_deleted_product(sender, instance, **kwargs):
+    cart_ids = getattr(instance, '_cart_ids', None)
+    if cart_ids:
+        refresh_cart_totals(Cart.objects.filter(pk__in=cart_ids))
+
+
+@receiver(post_save, sender=CustomUser)
+def recache_saved_user(sender, instance, raw=False, **kwargs):
+    if not raw:
+        cache_user(instance)
+
+
+@receiver(post_delete, sender=CustomUser)
+def forget_deleted_user(sender, instance, **kwargs):
+    forget_user(instance.pk)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def cache_blacklisted_token(sender, instance, raw=False, **kwargs):
+    if not raw:
+        remember_blacklisted(instance.token.jti, instance.token.expires_at)
+
+
+@receiver(post_save, sender=OutstandingToken)
+def cache_issued_token(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and instance.jti:
+        remember_not_blacklisted(instance.jti, instance.expires_at)
@@ -1,3 +1,157 @@
+import re
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from .models import Category, Product
+from .views import ProductListView
+
+FILTERS = [
+    '',
+    'category={category}',
+    'featured=true',
+    'min_price=10&max_price=50',
+    'category={category}&min_price=10&max_price=50',
+    'category={category}&featured=true',
+    'featured=true&min_price=10&max_price=50',
+]
+ORDERINGS = ['-created_at', 'price', '-price']
+MODES = ['pagination=cursor', 'page=1']
+# Cursor pages are also checked this deep into the list
+DEEP_PAGE = 25
+CHECKED_TABLES = (Product._meta.db_table, Category._meta.db_table)
+# Partial indexes hold only the rows their condition matches, so walking one is bounded
+PARTIAL_INDEXES = [index.name for index in Product._meta.indexes if index.condition is not None]
+
+
+@skipUnless(connection.vendor in ('postgresql', 'sqlite'), 'EXPLAIN output is only parsed for PostgreSQL and SQLite')
+class ProductQueryPlanTests(TestCase):
+    """
+    Every supported ProductFilter / ordering / pagination combination of
+    /api/products/ must be index-backed: EXPLAIN shows no sequential scan.
+    """
+
+    ROWS = 5000
+
+    @classmethod
+    def setUpTestData(cls):
+        categories = Category.objects.bulk_create([
+            Category(name=f'Plan check {i}', slug=f'plan-check-{i}', description='')
+            for i in range(20)
+        ])
+        products = []
+        for i in range(cls.ROWS):
+            price = Decimal(5 + (i * 7) % 500)
+            products.append(Product(
+                name=f'Plan check product {i}',
+                slug=f'plan-check-product-{i}',
+                description='',
+                price=price,
+                sale_price=price,
+                category=categories[i % len(categories)],
+                featured=(i % 10 == 0),
+                image='products/plan-check.png',
+            ))
+        Product.objects.bulk_create(products, batch_size=1000)
+        cls.category = categories[0].slug
+
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                for table in CHECKED_TABLES:
+                    cursor.execute(f'ANALYZE {connection.ops.quote_name(table)}')
+                # With seq scans disabled the planner only picks one when no index applies.
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            else:
+                cursor.execute('ANALYZE')
+
+    def combinations(self):
+        for filters in FILTERS:
+            for ordering in ORDERINGS:
+                for mode in MODES:
+                    params = [filters.format(category=self.category), f'ordering={ordering}', mode]
+                    yield '&'.join(param for param in params if param)
+
+    def captured_sql(self, query):
+        """
+        {page number: SELECTs issued by ProductListView for ?query} for the
+        first page and, with cursor pagination, the second page and the last
+        one up to DEEP_PAGE.
+        """
+        factory = APIRequestFactory()
+        pages = {}
+        url = f'/api/products/?{query}'
+        for page in range(1, DEEP_PAGE + 1):
+            request = Request(factory.get(url))
+            view = ProductListView(request=request, args=(), kwargs={}, format_kwarg=None)
+            with CaptureQueriesContext(connection) as queries:
+                queryset = view.filter_queryset(view.get_queryset())
+                view.paginate_queryset(queryset)
+            selects = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('SELECT')]
+            next_link = view.paginator.get_next_link()
+            if page <= 2 or not next_link or page == DEEP_PAGE:
+                pages[page] = selects
+            if 'cursor' not in query or not next_link:
+                break
+            url = next_link
+        return pages
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(f'EXPLAIN {sql}')
+                return [row[0] for row in cursor.fetchall()]
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+
+    def vm_steps(self, sql):
+        """Hundreds of SQLite VM instructions spent running `sql`."""
+        steps = [0]
+
+        def count():
+            steps[0] += 1
+            return 0
+
+        with connection.cursor() as cursor:
+            connection.connection.set_progress_handler(count, 100)
+            try:
+                cursor.execute(sql)
+                cursor.fetchall()
+            finally:
+                connection.connection.set_progress_handler(None, 0)
+        return steps[0]
+
+    def sequential_scans(self, sql, plan):
+        tables = '|'.join(re.escape(table) for table in CHECKED_TABLES)
+        if connection.vendor == 'postgresql':
+            pattern = re.compile(rf'Seq Scan on "?({tables})"?\b')
+        elif ' WHERE ' in sql:
+            # A filtered query must SEARCH an index range; "SCAN products USING
+            # INDEX" walks the whole index and only stops at the LIMIT
+            partial = '|'.join(re.escape(name) for name in PARTIAL_INDEXES)
+            pattern = re.compile(rf'^SCAN "?({tables})"?\b(?! USING (COVERING )?INDEX ({partial})\b)')
+        else:
+            # Unfiltered, an ordered index walk stops after one page; only a
+            # bare "SCAN products" (a full table scan) is a failure
+            pattern = re.compile(rf'^SCAN "?({tables})"?(?: AS \w+)?$')
+        return [line for line in plan if pattern.search(line.strip())]
+
+    def test_product_list_queries_are_index_backed(self):
+        for query in self.combinations():
+            pages = self.captured_sql(query)
+            for page, statements in pages.items():
+                for sql in statements:
+                    with self.subTest(query=query, page=page, sql=sql):
+                        plan = self.explain(sql)
+                        self.assertEqual(self.sequential_scans(sql, plan), [], '\n'.join(plan))
 
-# Create your tests here.
+            deep_page = max(pages)
+            if connection.vendor == 'sqlite' and deep_page > 2:
+                # SQLite may report a SEARCH yet still walk the index from the
+                # start; a keyset page must cost the same however deep it is
+                with self.subTest(query=query, page=deep_page):
+                    self.assertLessEqual(self.vm_steps(pages[deep_page][-1]), 2 * self.vm_steps(pages[2][-1]) + 1)
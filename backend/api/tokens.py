@@ -0,0 +1,58 @@
+"""
+Refresh tokens with a cached blacklist check.
+
+Every refresh token's blacklist status is kept in the cache until the token
+expires: "not blacklisted" when it is issued (an OutstandingToken row is
+created), overwritten with "blacklisted" when a BlacklistedToken row is saved
+(signals.py). Refreshing a token therefore needs no blacklist query unless
+its entry was evicted; a miss is answered from the database and cached again.
+
+This is only correct if every process reads the same entries, so the cache is
+bypassed unless it is shared between processes (api/checks.py warns).
+"""
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import aware_utcnow, datetime_from_epoch
+
+from .cache import cache_is_shared
+
+
+def _blacklist_key(jti):
+    return f'jwt:blacklisted:{jti}'
+
+
+def _remember(jti, blacklisted, expires_at, write):
+    timeout = int((expires_at - aware_utcnow()).total_seconds())
+    if timeout > 0 and cache_is_shared():
+        write(_blacklist_key(jti), blacklisted, timeout)
+
+
+def remember_blacklisted(jti, expires_at):
+    """Cache that `jti` is blacklisted until the token expires."""
+    _remember(jti, True, expires_at, cache.set)
+
+
+def remember_not_blacklisted(jti, expires_at):
+    # add(), not set(): never overwrite a "blacklisted" entry written meanwhile
+    _remember(jti, False, expires_at, cache.add)
+
+
+class CachedBlacklistRefreshToken(RefreshToken):
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if cache_is_shared():
+            blacklisted = cache.get(_blacklist_key(jti))
+            if blacklisted is not None:
+                if blacklisted:
+                    raise TokenError(_('Token is blacklisted'))
+                return
+
+        expires_at = datetime_from_epoch(self.payload['exp'])
+        if BlacklistedToken.objects.filter(token__jti=jti).exists():
+            remember_blacklisted(jti, expires_at)
+            raise TokenError(_('Token is blacklisted'))
+        remember_not_blacklisted(jti, expires_at)
@@ -9,13 +9,17 @@ urlpatterns = [
     path('auth/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('auth/signup/', views.signup, name='signup'),
     path('auth/me/', views.get_current_user, name='current_user'),
+    path('auth/me/membership/', views.get_product_membership, name='product_membership'),
     path('auth/profile/', views.update_profile, name='update_profile'),
     path('auth/logout/', views.logout, name='logout'),
     
     # ==================== PRODUCTS ====================
     path('products/', views.ProductListView.as_view(), name="product_list"),
+    path('products/facets/', views.product_facets, name='product_facets'),
     path('products/<slug:slug>/', views.ProductDetailView.as_view(), name='product_detail'),
     
+    path('home/feed/', views.homepage_feed, name='homepage_feed'),
+
     # ==================== CATEGORIES ====================
     path('categories/', views.category_list, name="category_list"),
     path('categories/<slug:slug>/', views.category_detail, name='category_detail'),
@@ -23,14 +27,20 @@ urlpatterns = [
     # ==================== CART ====================
     path('cart/add/', views.add_to_cart, name='add_to_cart'),
     path('cart/get/', views.get_cart, name='get_cart'),
+    path('cart/summary/', views.cart_summary, name='cart_summary'),
     path('cart/remove/', views.remove_from_cart, name='remove_from_cart'),
     path('cart/update/', views.update_cart_item, name='update_cart_item'),
     path('cart/clear/', views.clear_cart, name='clear_cart'),
+    path('cart/batch/', views.batch_update_cart, name='batch_update_cart'),
+    path('cart/merge/', views.merge_cart, name='merge_cart'),
 
     # ==================== WISHLIST ====================
     path('wishlist/get/', views.get_wishlist, name='get_wishlist'),
     path('wishlist/add/', views.add_to_wishlist, name='add_to_wishlist'),
     path('wishlist/remove/', views.remove_from_wishlist, name='remove_from_wishlist'),
+    path('wishlist/bulk-add/', views.bulk_add_to_wishlist, name='bulk_add_to_wishlist'),
+    path('wishlist/bulk-remove/', views.bulk_remove_from_wishlist, name='bulk_remove_from_wishlist'),
+    path('wishlist/move-to-cart/', views.move_to_cart, name='move_wishlist_to_cart'),
 
     # ==================== API DOCUMENTATION ====================
     path('schema/', SpectacularAPIView.as_view(), name='schema'),
@@ -0,0 +1,60 @@
+"""
+Cached profile fields of authenticated users (api.authentication).
+
+Entries are written through on every user save (signals.py), so they carry
+profile edits, role changes and deactivations as soon as they happen. A user
+that is not cached is authenticated from the token claims instead and loads
+the rest of its row lazily, which refills the entry (CustomUser.refresh_from_db).
+
+That only holds if every process sees the same entries: with a per-process
+cache, one worker would keep serving a user another worker deactivated. The
+entries are therefore not read unless the cache is shared (api/checks.py warns).
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache import cache_is_shared
+
+# Everything the API reads from request.user; the password hash is never cached
+USER_CACHE_FIELDS = (
+    'id', 'username', 'email', 'first_name', 'last_name', 'role', 'avatar',
+    'email_verified', 'is_active', 'is_staff', 'is_superuser', 'created_at', 'updated_at',
+)
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def _timeout():
+    # An entry overrides older access-token claims (role, deactivation), so it
+    # has to live at least as long as such a token can.
+    access_lifetime = settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME'].total_seconds()
+    return max(settings.USER_CACHE_TIMEOUT, int(access_lifetime))
+
+
+def cached_user_entry(user_id):
+    if not cache_is_shared():
+        return None
+    return cache.get(user_cache_key(user_id))
+
+
+def store_user_entry(entry):
+    cache.set(user_cache_key(entry['id']), entry, _timeout())
+
+
+def cache_user(user):
+    """Write `user` through to the cache, or drop its entry if fields are missing."""
+    if user.get_deferred_fields().intersection(USER_CACHE_FIELDS):
+        invalidate_user(user.pk)
+        return
+    store_user_entry({name: getattr(user, name) for name in USER_CACHE_FIELDS})
+
+
+def invalidate_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+def forget_user(user_id):
+    """Mark a deleted user so tokens issued to it stop authenticating."""
+    store_user_entry({'id': user_id, 'is_active': False})
@@ -1,18 +1,41 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import generics, status, viewsets
-from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework.filters import OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiTypes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from django.contrib.auth import get_user_model
-from .models import Cart, CartItem, Category, Product, Wishlist, WishlistItem
-from .filters import ProductFilter
+from .models import Category, Product, Wishlist, WishlistItem
+from .cache import cache_catalog_response, catalog_data_key
+from .cart_store import cart_store_for, flush_cart
+from .carts import load_cart_items, merge_user_carts
+from .conditional import cart_etag, cart_last_modified, catalog_etag, product_etag, product_last_modified
+from .fast_serializers import FastSerializationMixin, read_serializer
+from .feed import feed_json
+from .filters import ProductFilter, facet_counts
+from .membership import invalidate_membership, product_membership
+from .pagination import ProductCursorPagination, ProductPageNumberPagination
+from .search import ProductSearchFilter
+from .tokens import CachedBlacklistRefreshToken
+from .wishlists import (
+    add_wishlist_items,
+    load_wishlist_items,
+    move_wishlist_to_cart,
+    remove_wishlist_items,
+)
 from .serializers import (
+    CartBatchSerializer,
     CartSerializer, 
+    CartStatSerializer,
     CategoryDetailSerializer, 
     CategoryListSerializer, 
     ProductListSerializer, 
@@ -20,6 +43,8 @@ from .serializers import (
     UserSerializer,
     SignUpSerializer,
     CustomTokenObtainPairSerializer,
+    WishlistBulkSerializer,
+    WishlistMoveSerializer,
     WishlistSerializer,
     WishlistItemSerializer,
 )
@@ -28,6 +53,18 @@ User = get_user_model()
 
 # ==================== AUTHENTICATION VIEWS ====================
 
+def merged_cart_data(user, cart_code):
+    """
+    Fold the anonymous cart `cart_code` and the user's other carts into the
+    user's cart and return it serialized (None if the user has no cart).
+    """
+    if cart_code:
+        # A cart kept in the cache store is written to the database first
+        flush_cart(cart_code)
+    cart = merge_user_carts(user, cart_code)
+    return CartSerializer(load_cart_items(cart)).data if cart else None
+
+
 class CustomTokenObtainPairView(TokenObtainPairView):
     """
     Login endpoint that returns access and refresh tokens along with user data.
@@ -35,6 +72,18 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
     permission_classes = [AllowAny]
 
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        try:
+            serializer.is_valid(raise_exception=True)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+
+        data = serializer.validated_data
+        if request.data.get('cart_code'):
+            data['cart'] = merged_cart_data(serializer.user, request.data['cart_code'])
+        return Response(data, status=status.HTTP_200_OK)
+
 
 @extend_schema(request=SignUpSerializer, responses={201: SignUpSerializer})
 @api_view(['POST'])
@@ -46,12 +95,15 @@ def signup(request):
     serializer = SignUpSerializer(data=request.data)
     if serializer.is_valid():
         user = serializer.save()
-        refresh = RefreshToken.for_user(user)
-        return Response({
+        refresh = CustomTokenObtainPairSerializer.get_token(user)
+        data = {
             'access': str(refresh.access_token),
             'refresh': str(refresh),
             'user': UserSerializer(user).data,
-        }, status=status.HTTP_201_CREATED)
+        }
+        if request.data.get('cart_code'):
+            data['cart'] = merged_cart_data(user, request.data['cart_code'])
+        return Response(data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -66,6 +118,23 @@ def get_current_user(request):
     return Response(serializer.data)
 
 
+@extend_schema(responses={200: {
+    'type': 'object',
+    'properties': {
+        'wishlist': {'type': 'array', 'items': {'type': 'integer'}},
+        'cart': {'type': 'array', 'items': {'type': 'integer'}},
+    }
+}})
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_product_membership(request):
+    """
+    Ids of the products in the current user's wishlist and carts, for
+    "in wishlist" / "in cart" markers on product grids. Cached per user.
+    """
+    return Response(product_membership(request.user))
+
+
 @extend_schema(request=UserSerializer, responses={200: UserSerializer})
 @api_view(['PATCH'])
 @permission_classes([IsAuthenticated])
@@ -73,7 +142,8 @@ def update_profile(request):
     """
     Update the current user's profile.
     """
-    user = request.user
+    # request.user may hold stale token claims; never write those back
+    user = User.objects.get(pk=request.user.pk)
     serializer = UserSerializer(user, data=request.data, partial=True)
     if serializer.is_valid():
         serializer.save()
@@ -94,7 +164,7 @@ def logout(request):
     try:
         refresh_token = request.data.get("refresh")
         if refresh_token:
-            token = RefreshToken(refresh_token)
+            token = CachedBlacklistRefreshToken(refresh_token)
             token.blacklist()
         return Response({'message': 'Logged out successfully'}, status=status.HTTP_200_OK)
     except Exception as e:
@@ -103,60 +173,159 @@ def logout(request):
 
 # ==================== PRODUCT VIEWS ====================
 
-class ProductListView(generics.ListAPIView):
+@method_decorator(condition(etag_func=catalog_etag), name='dispatch')
+@method_decorator(cache_catalog_response, name='dispatch')
+class ProductListView(FastSerializationMixin, generics.ListAPIView):
     """
     Returns a list of all products with filtering, sorting, and pagination.
     Filtering: ?category=<slug>&featured=true
     Sorting: ?ordering=price or ?ordering=-price
+    Sparse fieldsets: ?fields=id,name,price or ?omit=description
+    Search: ?search=<terms>, full-text and ranked by relevance unless ?ordering= is given
+    Pagination: ?page=N (default), or ?pagination=cursor and then follow the
+    opaque `next` / `previous` links for keyset pagination without a count query.
+    Cursor pagination cannot keep the relevance order, so it rejects ?search= with a 400.
     """
     queryset = Product.objects.all().order_by('-created_at')
     serializer_class = ProductListSerializer
     permission_classes = [AllowAny]
-    filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
+    filter_backends = [DjangoFilterBackend, OrderingFilter, ProductSearchFilter]
     filterset_class = ProductFilter
     search_fields = ['name', 'description']
     ordering_fields = ['price', 'created_at']
     ordering = ['-created_at']
+    pagination_class = ProductPageNumberPagination
+    cursor_pagination_class = ProductCursorPagination
+
+    def get_queryset(self):
+        # Read only the columns the (sparse) serializer and sort keys need
+        columns = [*self.get_serializer_class().selected_columns(self.request), *self.ordering_fields]
+        return self.as_rows(super().get_queryset().only(*columns), columns)
 
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params
+            if 'cursor' in params or params.get('pagination') == 'cursor':
+                self._paginator = self.cursor_pagination_class()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
 
-class ProductDetailView(generics.RetrieveAPIView):
+
+@extend_schema(
+    parameters=[
+        OpenApiParameter(name='category', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY),
+        OpenApiParameter(name='featured', type=OpenApiTypes.BOOL, location=OpenApiParameter.QUERY),
+        OpenApiParameter(name='min_price', type=OpenApiTypes.NUMBER, location=OpenApiParameter.QUERY),
+        OpenApiParameter(name='max_price', type=OpenApiTypes.NUMBER, location=OpenApiParameter.QUERY),
+        OpenApiParameter(name='search', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY),
+    ],
+    responses={200: OpenApiTypes.OBJECT},
+)
+@condition(etag_func=catalog_etag)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def product_facets(request):
+    """
+    Facet counts for the product listing: products per category, featured vs. not
+    featured, and a sale_price histogram. Honors the same filter and ?search= params
+    as /api/products/ and is cached per filter signature until the catalog changes.
+    """
+    products_view = ProductListView(request=request, args=(), kwargs={}, format_kwarg=None)
+    signature_params = set(ProductFilter.base_filters) | {'search'}
+    signature = [
+        (name, value) for name, values in request.query_params.lists()
+        if name in signature_params for value in values
+    ]
+    key = catalog_data_key('facets', signature)
+
+    facets = cache.get(key)
+    if facets is None:
+        queryset = Product.objects.all()
+        for backend in (DjangoFilterBackend, ProductSearchFilter):
+            queryset = backend().filter_queryset(request, queryset, products_view)
+        facets = facet_counts(queryset)
+        cache.set(key, facets, settings.CATALOG_CACHE_TIMEOUT)
+    return Response(facets)
+
+
+@method_decorator(condition(etag_func=product_etag, last_modified_func=product_last_modified), name='dispatch')
+@method_decorator(cache_catalog_response, name='dispatch')
+class ProductDetailView(FastSerializationMixin, generics.RetrieveAPIView):
     """
     Returns details of a single product identified by its slug.
+    Supports ?fields= / ?omit= to trim the payload.
     """
     queryset = Product.objects.all()
     serializer_class = ProductDetailSerializer
     permission_classes = [AllowAny]
     lookup_field = 'slug'
 
+    def get_queryset(self):
+        columns = self.get_serializer_class().selected_columns(self.request)
+        return self.as_rows(super().get_queryset().only(*columns), columns)
+
+
+@extend_schema(responses={200: OpenApiTypes.OBJECT})
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def homepage_feed(request):
+    """
+    Precomputed homepage feed: featured products, top rated products and the
+    newest products per category. Served from materialized JSON, no serialization.
+    """
+    return HttpResponse(feed_json(), content_type='application/json')
+
 
 # ==================== CATEGORY VIEWS ====================
 
+@cache_catalog_response
 @extend_schema(responses={200: CategoryListSerializer(many=True)})
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def category_list(request):
     """
     Returns a list of all categories.
+    Supports ?fields= / ?omit= to trim the payload.
     """
-    categories = Category.objects.all()
-    serializer = CategoryListSerializer(categories, many=True)
+    categories = Category.objects.only(*CategoryListSerializer.selected_columns(request))
+    serializer = read_serializer(CategoryListSerializer, categories, many=True, context={'request': request})
     return Response(serializer.data)
 
 
+@condition(etag_func=catalog_etag)
+@cache_catalog_response
 @extend_schema(responses={200: CategoryDetailSerializer})
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def category_detail(request, slug):
     """
-    Returns details of a single category along with its products.
+    Returns details of a single category along with the first page of its products.
+    Accepts the same filter, search, ordering and pagination params as /api/products/.
     """
     category = get_object_or_404(Category, slug=slug)
-    serializer = CategoryDetailSerializer(category)
+
+    products_view = ProductListView(request=request, args=(), kwargs={}, format_kwarg=None)
+    queryset = products_view.filter_queryset(products_view.get_queryset().filter(category_id=category.id))
+    page = products_view.paginate_queryset(queryset)
+    products = products_view.get_paginated_response(
+        products_view.get_serializer(page, many=True).data
+    ).data
+
+    serializer = CategoryDetailSerializer(category, context={'request': request, 'products': products})
     return Response(serializer.data)
 
 
 # ==================== CART VIEWS ====================
 
+def parse_product_id(value):
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
+
 @extend_schema(
     request={'application/json': {
         'type': 'object', 
@@ -195,31 +364,25 @@ def add_to_cart(request):
     except (ValueError, TypeError):
         return Response({"error": "Invalid quantity format"}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Fetch or create the cart
-    cart, _ = Cart.objects.get_or_create(cart_code=cart_code)
-    
-    # Link to user if logged in
-    if request.user.is_authenticated:
-        cart.user = request.user
-        cart.save()
+    product_id = parse_product_id(product_id)
+    if product_id is None:
+        return Response({"error": "Invalid product_id format"}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Fetch the product or return 404
-    product = get_object_or_404(Product, id=product_id)
+    store = cart_store_for(request)
+    user = request.user if request.user.is_authenticated else None
 
-    # Fetch the cart item if it exists, otherwise create it
-    cartitem, created = CartItem.objects.get_or_create(product=product, cart=cart)
-    
-    if not created:
-        # If the item already exists, increment quantity
-        cartitem.quantity += quantity
-    else:
-        # If new item, set quantity
-        cartitem.quantity = quantity
+    # Fetch or create the cart
+    cart = store.get_or_create(cart_code, user)
 
-    cartitem.save()
+    # Insert the item or increment its quantity
+    if not store.add_item(cart, product_id, quantity):
+        return Response({"detail": "No Product matches the given query."}, status=status.HTTP_404_NOT_FOUND)
+
+    # Link to user if logged in
+    store.save(cart, user)
 
     # Serialize the updated cart and return
-    serializer = CartSerializer(cart)
+    serializer = CartSerializer(store.load(cart))
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -229,6 +392,7 @@ def add_to_cart(request):
     ],
     responses={200: CartSerializer}
 )
+@condition(etag_func=cart_etag, last_modified_func=cart_last_modified)
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_cart(request):
@@ -243,7 +407,9 @@ def get_cart(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    cart = get_object_or_404(Cart, cart_code=cart_code)
+    cart = cart_store_for(request).get(cart_code, with_items=True)
+    if cart is None:
+        return Response({"detail": "No Cart matches the given query."}, status=status.HTTP_404_NOT_FOUND)
     serializer = CartSerializer(cart)
     return Response(serializer.data)
 
@@ -274,11 +440,15 @@ def remove_from_cart(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    cart = get_object_or_404(Cart, cart_code=cart_code)
-    cartitem = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cartitem.delete()
+    store = cart_store_for(request)
+    cart = store.get(cart_code)
+    if cart is None:
+        return Response({"detail": "No Cart matches the given query."}, status=status.HTTP_404_NOT_FOUND)
+    if not store.remove_item(cart, parse_product_id(product_id)):
+        return Response({"detail": "No CartItem matches the given query."}, status=status.HTTP_404_NOT_FOUND)
+    store.save(cart)
     
-    serializer = CartSerializer(cart)
+    serializer = CartSerializer(store.load(cart))
     return Response(serializer.data)
 
 
@@ -315,16 +485,44 @@ def update_cart_item(request):
     except (ValueError, TypeError):
         return Response({"error": "Invalid quantity format"}, status=status.HTTP_400_BAD_REQUEST)
     
-    cart = get_object_or_404(Cart, cart_code=cart_code)
-    cartitem = get_object_or_404(CartItem, cart=cart, product_id=product_id)
+    store = cart_store_for(request)
+    cart = store.get(cart_code)
+    if cart is None:
+        return Response({"detail": "No Cart matches the given query."}, status=status.HTTP_404_NOT_FOUND)
+    # Deletes the item when quantity <= 0
+    if not store.set_quantity(cart, parse_product_id(product_id), quantity):
+        return Response({"detail": "No CartItem matches the given query."}, status=status.HTTP_404_NOT_FOUND)
+    store.save(cart)
     
-    if quantity <= 0:
-        cartitem.delete()
-    else:
-        cartitem.quantity = quantity
-        cartitem.save()
-    
-    serializer = CartSerializer(cart)
+    serializer = CartSerializer(store.load(cart))
+    return Response(serializer.data)
+
+
+@extend_schema(
+    parameters=[
+        OpenApiParameter(name='cart_code', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, required=True, description='The unique code for the cart')
+    ],
+    responses={200: CartStatSerializer}
+)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def cart_summary(request):
+    """
+    Item count and totals for a cart (navbar badge / mini-cart), read from the
+    denormalized Cart columns without loading any items.
+    """
+    cart_code = request.query_params.get("cart_code")
+
+    if not cart_code:
+        return Response(
+            {"error": "cart_code is required"}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    cart = cart_store_for(request).summary(cart_code)
+    if cart is None:
+        return Response({"detail": "No Cart matches the given query."}, status=status.HTTP_404_NOT_FOUND)
+    serializer = CartStatSerializer(cart)
     return Response(serializer.data)
 
 
@@ -352,13 +550,72 @@ def clear_cart(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    cart = get_object_or_404(Cart, cart_code=cart_code)
-    CartItem.objects.filter(cart=cart).delete()
+    store = cart_store_for(request)
+    cart = store.get(cart_code)
+    if cart is None:
+        return Response({"detail": "No Cart matches the given query."}, status=status.HTTP_404_NOT_FOUND)
+    store.clear(cart)
+    store.save(cart)
     
-    serializer = CartSerializer(cart)
+    serializer = CartSerializer(store.load(cart))
+    return Response(serializer.data)
+
+
+@extend_schema(
+    request=CartBatchSerializer,
+    responses={200: CartSerializer}
+)
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def batch_update_cart(request):
+    """
+    Apply a list of add / set / remove operations to a cart in one transaction.
+    Operations run in order; `set` creates the item if needed and a quantity
+    <= 0 removes it. The cart is created if it does not exist.
+    """
+    serializer = CartBatchSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    store = cart_store_for(request)
+    user = request.user if request.user.is_authenticated else None
+    cart = store.get_or_create(serializer.validated_data['cart_code'], user)
+
+    missing = store.apply_operations(cart, serializer.validated_data['operations'])
+    if missing:
+        return Response(
+            {"error": "Products not found", "product_ids": missing},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    store.save(cart, user)
+
+    serializer = CartSerializer(store.load(cart))
     return Response(serializer.data)
 
 
+@extend_schema(
+    request={'application/json': {
+        'type': 'object', 
+        'properties': {
+            'cart_code': {'type': 'string'}
+        }
+    }},
+    responses={200: CartSerializer}
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def merge_cart(request):
+    """
+    Merge the anonymous cart `cart_code` (optional) and all of the user's
+    carts into one: the user's most recently updated cart. Quantities of the
+    same product are summed. Returns the merged cart.
+    """
+    data = merged_cart_data(request.user, request.data.get("cart_code"))
+    if data is None:
+        return Response({"detail": "No Cart matches the given query."}, status=status.HTTP_404_NOT_FOUND)
+    return Response(data)
+
+
 # ==================== WISHLIST VIEWS ====================
 
 @api_view(['GET'])
@@ -368,7 +625,7 @@ def get_wishlist(request):
     Get user's wishlist.
     """
     wishlist, _ = Wishlist.objects.get_or_create(user=request.user)
-    serializer = WishlistSerializer(wishlist)
+    serializer = WishlistSerializer(load_wishlist_items(wishlist))
     return Response(serializer.data)
 
 @api_view(['POST'])
@@ -385,8 +642,9 @@ def add_to_wishlist(request):
     product = get_object_or_404(Product, id=product_id)
     
     WishlistItem.objects.get_or_create(wishlist=wishlist, product=product)
+    invalidate_membership(request.user.id)
     
-    serializer = WishlistSerializer(wishlist)
+    serializer = WishlistSerializer(load_wishlist_items(wishlist))
     return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 @api_view(['DELETE'])
@@ -401,6 +659,79 @@ def remove_from_wishlist(request):
     
     wishlist = get_object_or_404(Wishlist, user=request.user)
     WishlistItem.objects.filter(wishlist=wishlist, product_id=product_id).delete()
+    invalidate_membership(request.user.id)
     
-    serializer = WishlistSerializer(wishlist)
+    serializer = WishlistSerializer(load_wishlist_items(wishlist))
     return Response(serializer.data)
+
+
+@extend_schema(request=WishlistBulkSerializer, responses={201: WishlistSerializer})
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_add_to_wishlist(request):
+    """
+    Add several products to the user's wishlist at once (products already in
+    it are skipped). Nothing is added if any product does not exist.
+    """
+    serializer = WishlistBulkSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    wishlist, _ = Wishlist.objects.get_or_create(user=request.user)
+    missing = add_wishlist_items(wishlist, serializer.validated_data['product_ids'])
+    if missing:
+        return Response(
+            {"error": "Products not found", "product_ids": missing},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    serializer = WishlistSerializer(load_wishlist_items(wishlist))
+    return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+@extend_schema(request=WishlistBulkSerializer, responses={200: WishlistSerializer})
+@api_view(['DELETE'])
+@permission_classes([IsAuthenticated])
+def bulk_remove_from_wishlist(request):
+    """
+    Remove several products from the user's wishlist at once.
+    """
+    serializer = WishlistBulkSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    wishlist = get_object_or_404(Wishlist, user=request.user)
+    remove_wishlist_items(wishlist, serializer.validated_data['product_ids'])
+
+    serializer = WishlistSerializer(load_wishlist_items(wishlist))
+    return Response(serializer.data)
+
+
+@extend_schema(
+    request=WishlistMoveSerializer,
+    responses={200: {'type': 'object', 'properties': {
+        'cart': {'type': 'object'},
+        'wishlist': {'type': 'object'},
+    }}}
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def move_to_cart(request):
+    """
+    Move wishlist items (all of them, or `product_ids`) into the cart
+    `cart_code` in one transaction, adding one of each. Returns both.
+    """
+    serializer = WishlistMoveSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    wishlist = get_object_or_404(Wishlist, user=request.user)
+    store = cart_store_for(request)
+    cart = store.get_or_create(serializer.validated_data['cart_code'], request.user)
+    move_wishlist_to_cart(wishlist, cart, serializer.validated_data.get('product_ids'))
+    store.save(cart, request.user)
+
+    return Response({
+        'cart': CartSerializer(store.load(cart)).data,
+        'wishlist': WishlistSerializer(load_wishlist_items(wishlist)).data,
+    })
@@ -0,0 +1,64 @@
+"""
+Wishlist helpers shared by the wishlist views: bulk add / remove with
+set-based statements and an atomic move of wishlist items into a cart.
+"""
+from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
+
+from .carts import add_cart_items
+from .membership import invalidate_membership
+from .models import Product, WishlistItem
+
+
+def load_wishlist_items(wishlist):
+    """Attach items and their products in one query so WishlistSerializer runs without N+1."""
+    prefetch_related_objects(
+        [wishlist],
+        Prefetch('items', queryset=WishlistItem.objects.select_related('product').order_by('id')),
+    )
+    return wishlist
+
+
+def add_wishlist_items(wishlist, product_ids):
+    """
+    Add products to the wishlist with one INSERT that skips products already
+    in it. Returns the sorted ids of unknown products, in which case nothing
+    is added.
+    """
+    product_ids = set(product_ids)
+    missing = product_ids - set(Product.objects.filter(id__in=product_ids).values_list('id', flat=True))
+    if missing:
+        return sorted(missing)
+    WishlistItem.objects.bulk_create(
+        [WishlistItem(wishlist=wishlist, product_id=product_id) for product_id in sorted(product_ids)],
+        ignore_conflicts=True,
+    )
+    invalidate_membership(wishlist.user_id)
+    return []
+
+
+def remove_wishlist_items(wishlist, product_ids):
+    """Remove products from the wishlist with one DELETE; returns how many were removed."""
+    removed, _ = WishlistItem.objects.filter(wishlist=wishlist, product_id__in=product_ids).delete()
+    invalidate_membership(wishlist.user_id)
+    return removed
+
+
+def move_wishlist_to_cart(wishlist, cart, product_ids=None):
+    """
+    Move wishlist items (all, or only `product_ids`) into `cart` in one
+    transaction: one quantity is added per product (incrementing items
+    already in the cart) and the items leave the wishlist. Returns the moved
+    product ids. The caller touches the cart afterwards.
+    """
+    items = WishlistItem.objects.filter(wishlist=wishlist)
+    if product_ids is not None:
+        items = items.filter(product_id__in=product_ids)
+    with transaction.atomic():
+        moved = list(items.select_for_update().order_by('id').values_list('product_id', flat=True))
+        if moved:
+            add_cart_items(cart, {product_id: 1 for product_id in moved})
+            items.filter(product_id__in=moved).delete()
+    if moved:
+        invalidate_membership(wishlist.user_id)
+    return moved
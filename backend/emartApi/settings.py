@@ -168,9 +168,10 @@ if not DEBUG:
     SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
 
 # Authentication Backends
+# EmailBackend covers ModelBackend (USERNAME_FIELD is email, permissions are
+# inherited); listing both would hash every failed login twice
 AUTHENTICATION_BACKENDS = [
     'api.authentication.EmailBackend',
-    'django.contrib.auth.backends.ModelBackend',
 ]
 
 # Default primary key field type
@@ -195,6 +196,7 @@ SIMPLE_JWT = {
     'ISSUER': None,
     'JTI_CLAIM': 'jti',
     'TOKEN_TYPE_CLAIM': 'token_type',
+    'TOKEN_REFRESH_SERIALIZER': 'api.serializers.CachedTokenRefreshSerializer',
     'SLIDING_TOKEN_REFRESH_EXP_CLAIM': 'refresh_exp',
     'SLIDING_TOKEN_LIFETIME': timedelta(minutes=5),
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
@@ -203,7 +205,7 @@ SIMPLE_JWT = {
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
@@ -214,6 +216,44 @@ REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
+# Cache
+# Use a shared backend (Redis/Memcached/database) in production so catalog
+# invalidations reach every worker process. The refresh-token blacklist cache
+# is bypassed on per-process backends (`manage.py check --deploy` warns).
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='emart'),
+    }
+}
+
+# Catalog response cache (api/cache.py)
+CATALOG_CACHE_TIMEOUT = config('CATALOG_CACHE_TIMEOUT', default=300, cast=int)
+CATALOG_CACHE_GZIP = config('CATALOG_CACHE_GZIP', default=True, cast=bool)
+
+# Serialize catalog reads from .values() rows with compiled converters (api/fast_serializers.py)
+FAST_SERIALIZATION = config('FAST_SERIALIZATION', default=False, cast=bool)
+
+# Product search: also match names by pg_trgm similarity (PostgreSQL only)
+PRODUCT_SEARCH_TRIGRAM = config('PRODUCT_SEARCH_TRIGRAM', default=False, cast=bool)
+
+# Cart storage (api/cart_store.py): 'db', or 'cache' to keep anonymous carts in
+# CACHES and write them back with `manage.py flush_carts`. Flush more often
+# than CART_CACHE_TIMEOUT, or unflushed changes expire with the cache entry.
+# 'cache' needs a shared CACHE_BACKEND; startup fails (api.E001) on LocMemCache.
+CART_STORE = config('CART_STORE', default='db')
+CART_CACHE_TIMEOUT = config('CART_CACHE_TIMEOUT', default=60 * 60 * 24 * 7, cast=int)
+
+# Anonymous carts idle for longer are removed by `manage.py delete_expired_carts`
+CART_TTL_DAYS = config('CART_TTL_DAYS', default=30, cast=int)
+
+# Per-user wishlist / cart product-id sets (api/membership.py)
+MEMBERSHIP_CACHE_TIMEOUT = config('MEMBERSHIP_CACHE_TIMEOUT', default=300, cast=int)
+
+# Profile fields of authenticated users (api/user_cache.py); entries live at
+# least as long as an access token
+USER_CACHE_TIMEOUT = config('USER_CACHE_TIMEOUT', default=900, cast=int)
+
 # Swagger Settings
 SPECTACULAR_SETTINGS = {
     'TITLE': 'E-Mart API',